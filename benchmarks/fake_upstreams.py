@@ -0,0 +1,184 @@
+"""
+Offline stand-ins for TMDB, Open-Meteo and the webhook receiver.
+
+Point the app at them through the usual environment variables:
+
+    TMDB_URL=http://127.0.0.1:9100/3
+    WEATHER_URL=http://127.0.0.1:9100/v1/archive
+    WEBHOOK_URL=http://127.0.0.1:9100/webhook
+
+and start them with:
+
+    python -m benchmarks.fake_upstreams --port 9100 --latency-ms 40 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import uvicorn
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy", 80: "Crime",
+    99: "Documentary", 18: "Drama", 10751: "Family", 14: "Fantasy", 36: "History",
+    27: "Horror", 10402: "Music", 9648: "Mystery", 10749: "Romance", 878: "Science Fiction",
+    10770: "TV Movie", 53: "Thriller", 10752: "War", 37: "Western",
+}
+
+
+@dataclass
+class UpstreamBehaviour:
+    """
+    How the fake upstreams misbehave.
+
+    Latency is log-normal around ``latency_ms`` (median) with shape ``latency_sigma``.
+    ``error_rate`` of the requests answer 500. Above ``rate_limit_rps`` requests per
+    second (0 disables it) requests answer 429 with a Retry-After header.
+    """
+    latency_ms: float = 40.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rps: float = 0.0
+    not_found_prefix: str = "zzz"
+
+
+def _stable_int(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=4).digest(), "big")
+
+
+def _movie(movie_id: int, title: str) -> dict:
+    release = date(2016, 1, 1) + timedelta(days=movie_id % 3000)
+    genre_ids = list(GENRES)
+    return {
+        "adult": False,
+        "backdrop_path": f"/{movie_id}-backdrop.jpg",
+        "genre_ids": [genre_ids[movie_id % len(genre_ids)], genre_ids[(movie_id // 7) % len(genre_ids)]],
+        "id": movie_id,
+        "original_language": "en",
+        "original_title": title,
+        "overview": f"A fake overview for {title}. " * 4,
+        "popularity": round(1 + (movie_id % 1000) / 10, 3),
+        "poster_path": f"/{movie_id}-poster.jpg",
+        "release_date": release.isoformat(),
+        "title": title,
+        "video": False,
+        "vote_average": round((movie_id % 100) / 10, 1),
+        "vote_count": movie_id % 5000,
+    }
+
+
+def create_app(behaviour: UpstreamBehaviour) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+    calls: Counter = Counter()
+    window = {"second": 0, "count": 0}
+
+    @app.middleware("http")
+    async def misbehave(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_"):
+            return await call_next(request)
+
+        calls[path.split("/")[2] if path.startswith("/3/") else path.strip("/").split("/")[-1]] += 1
+        calls["total"] += 1
+
+        if behaviour.latency_ms > 0:
+            await asyncio.sleep(random.lognormvariate(math.log(behaviour.latency_ms / 1000), behaviour.latency_sigma))
+
+        if behaviour.rate_limit_rps > 0:
+            second = int(time.monotonic())
+            if window["second"] != second:
+                window["second"], window["count"] = second, 0
+            window["count"] += 1
+            if window["count"] > behaviour.rate_limit_rps:
+                calls["rate_limited"] += 1
+                return JSONResponse({"status_message": "Rate limit exceeded"}, status_code=429, headers={"Retry-After": "1"})
+
+        if behaviour.error_rate > 0 and random.random() < behaviour.error_rate:
+            calls["errors"] += 1
+            return JSONResponse({"status_message": "Internal error"}, status_code=500)
+
+        return await call_next(request)
+
+    @app.get("/3/search/movie")
+    async def search_movie(query: str, language: str = "en-US"):
+        if query.casefold().startswith(behaviour.not_found_prefix):
+            return {"page": 1, "results": [], "total_results": 0}
+
+        title = " ".join(query.split()).title()
+        return {"page": 1, "results": [_movie(_stable_int(title.casefold()) % 1_000_000, title)], "total_results": 1}
+
+    @app.get("/3/genre/movie/list")
+    async def genre_list(language: str = "en"):
+        return {"genres": [{"id": genre_id, "name": name} for genre_id, name in GENRES.items()]}
+
+    @app.get("/3/movie/{movie_id}")
+    async def movie_details(movie_id: int, language: str = "en-US", append_to_response: str = ""):
+        movie = _movie(movie_id, f"Movie {movie_id}")
+        movie["genres"] = [{"id": genre_id, "name": GENRES[genre_id]} for genre_id in movie.pop("genre_ids")]
+        movie["runtime"] = 90 + movie_id % 60
+        for extra in filter(None, append_to_response.split(",")):
+            movie[extra] = {"results": []} if extra != "credits" else {"cast": [], "crew": []}
+        return movie
+
+    @app.get("/v1/archive")
+    async def archive(latitude: float, longitude: float, start_date: str, end_date: str, daily: str = "", timezone: str = "auto"):
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        days = [(start + timedelta(days=offset)) for offset in range((end - start).days + 1)]
+        base = 25 - abs(latitude) / 3
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": {
+                "time": [day.isoformat() for day in days],
+                "temperature_2m_max": [round(base + 5 + (day.toordinal() % 7), 1) for day in days],
+                "temperature_2m_min": [round(base - 5 + (day.toordinal() % 5), 1) for day in days],
+            },
+        }
+
+    @app.post("/webhook")
+    async def webhook(request: Request):
+        await request.body()
+        return {"received": True}
+
+    @app.get("/_stats")
+    async def stats():
+        return dict(calls)
+
+    @app.post("/_reset")
+    async def reset():
+        calls.clear()
+        return {"reset": True}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline TMDB / Open-Meteo / webhook stand-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Median upstream latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal shape; larger means a longer tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answering 500")
+    parser.add_argument("--rate-limit-rps", type=float, default=0.0, help="Requests per second before answering 429 (0 disables)")
+    args = parser.parse_args()
+
+    behaviour = UpstreamBehaviour(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rps=args.rate_limit_rps,
+    )
+    uvicorn.run(create_app(behaviour), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Load and latency benchmark for the movie endpoints, fully offline.
+
+Starts the fake upstreams in a subprocess, points the app at them through
+TMDB_URL / WEATHER_URL / WEBHOOK_URL and drives the real ASGI app in-process
+at fixed concurrency levels:
+
+    python -m benchmarks.run_benchmark --concurrency 1,16,64 --requests 500
+    python -m benchmarks.run_benchmark --save-baseline      # refresh benchmarks/baseline.json
+
+Reports req/s, p50/p95/p99 latency, upstream calls per request and memory (the
+median of ``--runs`` runs, each in a fresh process), and exits with status 1
+when a result regresses against the stored baseline.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+ENDPOINTS = {
+    "search": "/api/v1/movies/search-movie",
+    "weather": "/api/v1/movies/get-movie-and-weather-data",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_fake_upstreams(port: int, args: argparse.Namespace) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_upstreams",
+            "--port", str(port),
+            "--latency-ms", str(args.latency_ms),
+            "--latency-sigma", str(args.latency_sigma),
+            "--error-rate", str(args.error_rate),
+            "--rate-limit-rps", str(args.rate_limit_rps),
+        ],
+        cwd=ROOT,
+    )
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/_stats", timeout=0.5)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError("Fake upstreams did not start.")
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _upstream_calls(upstream: str) -> int:
+    # TMDB and Open-Meteo calls only; webhook deliveries are one per request by design.
+    stats = httpx.get(f"{upstream}/_stats").json()
+    return stats.get("total", 0) - stats.get("webhook", 0)
+
+
+def _payload(endpoint: str, rng: random.Random, distinct_titles: int, cities: list[tuple[float, float]]) -> dict:
+    # Zipf-like popularity: a few titles take most of the traffic.
+    rank = min(distinct_titles, int(rng.paretovariate(1.16)))
+    payload = {"movie_title": f"Benchmark Movie {rank}", "language": "en-US"}
+    if endpoint == "weather":
+        # Users cluster around cities, a few kilometres apart.
+        latitude, longitude = rng.choice(cities)
+        payload["latitude"] = round(latitude + rng.uniform(-0.05, 0.05), 4)
+        payload["longitude"] = round(longitude + rng.uniform(-0.05, 0.05), 4)
+    return payload
+
+
+async def _run_level(client: httpx.AsyncClient, upstream: str, endpoint: str, concurrency: int, requests: int, distinct_titles: int, seed: int) -> dict:
+    city_rng = random.Random(0)
+    cities = [(city_rng.uniform(-40, 60), city_rng.uniform(-120, 140)) for _ in range(50)]
+    rng = random.Random(seed)
+    payloads = [_payload(endpoint, rng, distinct_titles, cities) for _ in range(requests)]
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    queue = iter(payloads)
+
+    upstream_before = _upstream_calls(upstream)
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+    async def worker() -> None:
+        for payload in queue:
+            started = time.perf_counter()
+            response = await client.post(ENDPOINTS[endpoint], json=payload)
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    upstream_calls = _upstream_calls(upstream) - upstream_before
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": requests,
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "upstream_calls_per_request": round(upstream_calls / requests, 3),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "peak_traced_mb": round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2) if tracemalloc.is_tracing() else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _compare(results: list[dict], baseline: list[dict], tolerance: float, p99_slack_ms: float) -> list[str]:
+    previous = {(row["endpoint"], row["concurrency"]): row for row in baseline}
+    regressions = []
+
+    for row in results:
+        before = previous.get((row["endpoint"], row["concurrency"]))
+        if before is None:
+            continue
+
+        name = f"{row['endpoint']}@{row['concurrency']}"
+        if row["req_per_s"] < before["req_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: req/s {before['req_per_s']} -> {row['req_per_s']}")
+        # The absolute slack keeps scheduler jitter on millisecond-level tails from failing the run.
+        if row["p99_ms"] > before["p99_ms"] * (1 + tolerance) + p99_slack_ms:
+            regressions.append(f"{name}: p99 {before['p99_ms']}ms -> {row['p99_ms']}ms")
+        if row["upstream_calls_per_request"] > before["upstream_calls_per_request"] * (1 + tolerance) + 0.01:
+            regressions.append(f"{name}: upstream calls/request {before['upstream_calls_per_request']} -> {row['upstream_calls_per_request']}")
+
+    return regressions
+
+
+def _print_table(results: list[dict]) -> None:
+    columns = ["endpoint", "concurrency", "req_per_s", "p50_ms", "p95_ms", "p99_ms", "upstream_calls_per_request", "errors", "peak_traced_mb", "max_rss_mb"]
+    widths = [max(len(column), *(len(str(row[column])) for row in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in results:
+        print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+async def _benchmark(args: argparse.Namespace, upstream: str) -> list[dict]:
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    from src.app import App
+
+    app = App().asgi_app
+    results = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            for endpoint in args.endpoints.split(","):
+                for concurrency in (int(level) for level in args.concurrency.split(",")):
+                    # A different seed per level so each level sees new coordinates and some cold titles.
+                    seed = args.seed * 1000 + concurrency
+                    results.append(await _run_level(client, upstream, endpoint, concurrency, args.requests, args.distinct_titles, seed))
+
+    return results
+
+
+def _run_once(args: argparse.Namespace) -> list[dict]:
+    port = _free_port()
+    upstream = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        "TMDB_URL": f"{upstream}/3",
+        "TMDB_API_KEY": "benchmark",
+        "WEATHER_URL": f"{upstream}/v1/archive",
+        "WEBHOOK_URL": f"{upstream}/webhook",
+        "HOST": "127.0.0.1",
+        "PORT": "8000",
+        "UPSTREAM_RATE": str(args.upstream_rate),
+        "UPSTREAM_BURST": str(args.upstream_rate),
+    })
+    os.environ.pop("UPSTREAM_RATE_LIMITS", None)
+    os.environ.pop("SHARED_CACHE_PATH", None)
+
+    fake_upstreams = _start_fake_upstreams(port, args)
+    try:
+        if args.trace_memory:
+            tracemalloc.start()
+        results = asyncio.run(_benchmark(args, upstream))
+    finally:
+        fake_upstreams.terminate()
+        fake_upstreams.wait()
+
+    return results
+
+
+def _median(runs: list[list[dict]]) -> list[dict]:
+    # Field by field, so that one noisy run does not decide the result.
+    results = []
+    for rows in zip(*runs):
+        row = dict(rows[0])
+        for key, value in row.items():
+            if isinstance(value, (int, float)) and key not in ("concurrency", "requests"):
+                row[key] = round(statistics.median(other[key] for other in rows), 3)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load/latency benchmark for the movie endpoints.")
+    parser.add_argument("--endpoints", default="search,weather", help="Comma-separated: search, weather")
+    parser.add_argument("--concurrency", default="1,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per level")
+    parser.add_argument("--distinct-titles", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=0.0)
+    parser.add_argument("--upstream-rate", type=float, default=100000.0,
+                        help="App-side UPSTREAM_RATE/UPSTREAM_BURST; every fake upstream shares one host, so the default keeps the app's own rate limiter out of the measurement")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--p99-slack-ms", type=float, default=5.0, help="Allowed absolute p99 regression on top of --tolerance")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per level, each in a fresh process; the median is reported")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python allocations (slows the app down)")
+    args = parser.parse_args()
+
+    # Every run gets a fresh process, so in-process caches start cold each time.
+    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        runs = [pool.apply(_run_once, (args,)) for _ in range(args.runs)]
+    results = _median(runs)
+
+    _print_table(results)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if args.baseline.exists():
+        regressions = _compare(results, json.loads(args.baseline.read_text()), args.tolerance, args.p99_slack_ms)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
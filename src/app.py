@@ -1,32 +1,69 @@
-import os
-import uvicorn
+import time
+
+_imports_started = time.perf_counter()
+
+# Everything below is imported at boot; jinja2 (home page) and uvicorn (App.start)
+# are imported where they are used to keep cold starts short.
+import asyncio
+import httpx
+
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
-from fastapi.responses import HTMLResponse
-from jinja2 import Environment, FileSystemLoader
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 
-from src.helpers.load_env.load_env import LoadEnv
+from src.helpers.admission.admission import AdmissionController
+from src.helpers.compression.compression import StreamingAwareGZipMiddleware
+from src.helpers.fetch.deadline import DeadlineMiddleware
+from src.helpers.fetch.http_pool import HttpPool
+from src.helpers.fetch.upstream_scheduler import UpstreamScheduler
+from src.helpers.metrics.metrics import Gauges, MetricsMiddleware, registry, startup_phase, startup_phases, startup_report
+from src.helpers.settings.settings import get_settings
+from src.helpers.static_page.static_page import StaticPage
 from src.routers.api.movie_routers import api_movies_router
+from src.utils.suggest_utils import suggest_cache
+from src.utils.tmdb_utils import enrichment_cache, genre_catalog, movie_cache, search_cache, title_index
+from src.utils.weather_utils import weather_cache, weather_coalescer
+from src.utils.webhook_utils import webhook_dispatcher
+
+startup_phases["imports"] = time.perf_counter() - _imports_started
+
 
 class App:
     def __init__(self) -> None:
+        with startup_phase("app"):
+            self.__setup()
+
+    def __setup(self) -> None:
+        self.settings = get_settings()
+
         self.app: FastAPI = FastAPI(
             title="Movie API",
             description="This is a simple API to get movie information",
             version="1.0.0",
             openapi_url="/api/v1/openapi.json",
             docs_url="/docs",
-            redoc_url="/redoc"
+            redoc_url="/redoc",
+            default_response_class=ORJSONResponse,
+            lifespan=self.lifespan
         )
 
-        self.host = LoadEnv("HOST").get_value()
-        self.port = int(LoadEnv("PORT").get_value())
+        self.host = self.settings.host
+        self.port = self.settings.port
+        self.genre_languages = list(self.settings.genre_catalog_languages)
 
-        self.templates = Environment(loader=FileSystemLoader("src/templates"))
+        self.templates = None
+        # Rendered by the pre-warm phase, or by the first request for "/".
+        self.home_page = StaticPage(
+            self.render_home,
+            watch="src/templates/index.html" if self.settings.template_auto_reload else None,
+            lazy=True,
+        )
 
         self.load_config()
+        self.setup_metrics()
         self.setup_docs()
         self.setup_api_routes()
         self.setup_routes()
@@ -35,7 +72,87 @@ class App:
     def asgi_app(self) -> FastAPI:
         return self.app
 
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        with startup_phase("warm_up"):
+            if self.settings.startup_prewarm:
+                await asyncio.gather(genre_catalog.start(self.genre_languages), self.prewarm())
+            else:
+                await genre_catalog.start(self.genre_languages)
+            webhook_dispatcher.start(self.settings.webhook_url)
+        print(startup_report())
+        yield
+        await webhook_dispatcher.stop()
+        await genre_catalog.stop()
+        await HttpPool.close()
+
+    async def prewarm(self) -> None:
+        """
+        Opens the upstream connections and loads the local caches before the worker
+        reports ready, bounded by STARTUP_PREWARM_TIMEOUT. Failures are only logged.
+        """
+        async def connect(url: str) -> None:
+            # Any answer will do: it leaves a pooled connection (and its TLS session) behind.
+            try:
+                await HttpPool.client_for(url).head(url)
+            except httpx.HTTPError as e:
+                print(f"Warning: Could not pre-warm a connection to {url}: {e}")
+
+        def load_local() -> None:
+            title_index.current()
+            self.home_page.render()
+
+        urls = [url for url in (self.settings.tmdb_url, self.settings.weather_url, self.settings.webhook_url) if url]
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(connect(url) for url in urls), asyncio.to_thread(load_local)),
+                timeout=self.settings.startup_prewarm_timeout,
+            )
+        except asyncio.TimeoutError:
+            print("Warning: Pre-warming did not finish before STARTUP_PREWARM_TIMEOUT.")
+
+    def render_home(self) -> str:
+        from jinja2 import Environment, FileSystemLoader
+
+        if self.templates is None:
+            self.templates = Environment(loader=FileSystemLoader("src/templates"))
+
+        api_url = "http://127.0.0.1:8000/api/v1/movies"
+
+        fields = [
+            {"id": "movie-title", "name": "movie-title", "type": "text", "label": "Movie Title", "placeholder": "E.g., Inception", "list": "movie-title-suggestions"},
+            {"id": "language", "name": "language", "type": "text", "label": "Language", "placeholder": "E.g., en-US"},
+            {"id": "latitude", "name": "latitude", "type": "number", "label": "Latitude", "placeholder": "E.g., 37.7749", "step": "any"},
+            {"id": "longitude", "name": "longitude", "type": "number", "label": "Longitude", "placeholder": "E.g., -122.4194", "step": "any"}
+        ]
+
+        result_elements = [
+            {"id": "result-title", "class": "mt-2 text-gray-800"},
+            {"id": "result-genres", "class": "mt-2 text-gray-800"},
+            {"id": "result-release-date", "class": "mt-2 text-gray-800"},
+            {"id": "result-adult", "class": "mt-2 text-gray-800"},
+            {"id": "result-backdrop-path", "class": "mt-2 text-gray-800"},
+            {"id": "result-original-language", "class": "mt-2 text-gray-800"},
+            {"id": "result-original-title", "class": "mt-2 text-gray-800"},
+            {"id": "result-overview", "class": "mt-2 text-gray-800"},
+            {"id": "result-popularity", "class": "mt-2 text-gray-800"},
+            {"id": "result-poster-path", "class": "mt-2 text-gray-800"},
+            {"id": "result-video", "class": "mt-2 text-gray-800"},
+            {"id": "result-vote-average", "class": "mt-2 text-gray-800"},
+            {"id": "result-vote-count", "class": "mt-2 text-gray-800"},
+            {"id": "result-weather", "class": "mt-2 text-gray-800"}
+        ]
+
+        template = self.templates.get_template("index.html")
+        return template.render(title=self.app.title, fields=fields, api_url=api_url, result_elements=result_elements)
+
     def load_config(self) -> None:
+        self.app.add_middleware(
+            StreamingAwareGZipMiddleware,
+            minimum_size=self.settings.gzip_minimum_size,
+            compresslevel=self.settings.gzip_level,
+        )
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=["*"],
@@ -43,6 +160,49 @@ class App:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        self.app.add_middleware(DeadlineMiddleware)
+
+    def setup_metrics(self) -> None:
+        self.app.add_middleware(MetricsMiddleware)
+
+        def cache_stats() -> dict:
+            stats = {}
+            for cache_name, cache in (("tmdb_search", search_cache), ("tmdb_movie", movie_cache), ("tmdb_enrichment", enrichment_cache), ("suggest", suggest_cache), ("weather", weather_cache)):
+                for stat, value in cache.stats().items():
+                    stats[(cache_name, stat)] = value
+            stats[("weather", "upstream_calls")] = weather_coalescer.upstream_calls
+            stats[("weather", "coalesced_days")] = weather_coalescer.coalesced
+            return stats
+
+        registry.register(Gauges("cache_stats", "In-process cache counters and sizes.", ("cache", "stat"), cache_stats))
+        registry.register(Gauges(
+            "upstream_scheduler_stats", "Upstream rate limiting, retry and circuit breaker state per host.", ("host", "stat"),
+            lambda: {
+                (host, stat): value
+                for host, scheduler in UpstreamScheduler.all().items()
+                for stat, value in scheduler.stats().items()
+            },
+        ))
+        registry.register(Gauges(
+            "admission_stats", "Admission control slots, queue depth and shed counts per route.", ("route", "stat"),
+            lambda: {
+                (route, stat): value
+                for route, controller in AdmissionController.all().items()
+                for stat, value in controller.stats().items()
+            },
+        ))
+        registry.register(Gauges(
+            "startup_duration_seconds", "Duration of each startup phase of this worker.", ("phase",),
+            lambda: {(phase,): duration for phase, duration in startup_phases.items()},
+        ))
+        registry.register(Gauges(
+            "webhook_stats", "Webhook delivery queue counters.", ("stat",),
+            lambda: {(stat,): value for stat, value in webhook_dispatcher.stats().items()},
+        ))
+
+        @self.app.get("/metrics", include_in_schema=False)
+        async def metrics() -> Response:
+            return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
 
     async def custom_swagger_ui_html(self) -> HTMLResponse:
         return get_swagger_ui_html(
@@ -67,38 +227,30 @@ class App:
         self.app.include_router(api_movies_router)
 
     def setup_routes(self) -> None:
+        @self.app.get("/cache-stats", include_in_schema=False)
+        async def cache_stats() -> dict:
+            return {
+                "tmdb_search": search_cache.stats(),
+                "tmdb_movie": movie_cache.stats(),
+                "tmdb_enrichment": enrichment_cache.stats(),
+                "suggest": suggest_cache.stats(),
+                "weather": {
+                    **weather_cache.stats(),
+                    "upstream_calls": weather_coalescer.upstream_calls,
+                    "coalesced_days": weather_coalescer.coalesced,
+                },
+            }
+
+        @self.app.get("/webhook-stats", include_in_schema=False)
+        async def webhook_stats() -> dict:
+            return webhook_dispatcher.stats()
+
         @self.app.get("/", response_class=HTMLResponse)
-        async def home(request: Request):
-            api_url = "http://127.0.0.1:8000/api/v1/movies"
-
-            fields = [
-                {"id": "movie-title", "name": "movie-title", "type": "text", "label": "Movie Title", "placeholder": "E.g., Inception"},
-                {"id": "language", "name": "language", "type": "text", "label": "Language", "placeholder": "E.g., en-US"},
-                {"id": "latitude", "name": "latitude", "type": "number", "label": "Latitude", "placeholder": "E.g., 37.7749", "step": "any"},
-                {"id": "longitude", "name": "longitude", "type": "number", "label": "Longitude", "placeholder": "E.g., -122.4194", "step": "any"}
-            ]
-
-            result_elements = [
-                {"id": "result-title", "class": "mt-2 text-gray-800"},
-                {"id": "result-genres", "class": "mt-2 text-gray-800"},
-                {"id": "result-release-date", "class": "mt-2 text-gray-800"},
-                {"id": "result-adult", "class": "mt-2 text-gray-800"},
-                {"id": "result-backdrop-path", "class": "mt-2 text-gray-800"},
-                {"id": "result-original-language", "class": "mt-2 text-gray-800"},
-                {"id": "result-original-title", "class": "mt-2 text-gray-800"},
-                {"id": "result-overview", "class": "mt-2 text-gray-800"},
-                {"id": "result-popularity", "class": "mt-2 text-gray-800"},
-                {"id": "result-poster-path", "class": "mt-2 text-gray-800"},
-                {"id": "result-video", "class": "mt-2 text-gray-800"},
-                {"id": "result-vote-average", "class": "mt-2 text-gray-800"},
-                {"id": "result-vote-count", "class": "mt-2 text-gray-800"},
-                {"id": "result-weather", "class": "mt-2 text-gray-800"}
-            ]
-
-            template = self.templates.get_template("index.html")
-            content = template.render(title=self.app.title, fields=fields, api_url=api_url, result_elements=result_elements)
-            return HTMLResponse(content=content)
+        async def home(request: Request) -> Response:
+            return self.home_page.response(request)
 
 
     def start(self) -> None:
+        import uvicorn
+
         uvicorn.run(self.app, host=self.host, port=self.port, log_level="info", reload=True)
@@ -1,74 +1,455 @@
-from fastapi import HTTPException, status
+import asyncio
+import orjson
+import time
+
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import Header, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from src.helpers.admission.admission import AdmissionController, AdmissionRejectedError
+from src.helpers.fetch.deadline import DeadlineExceededError, deadline, request_deadline
+from src.helpers.fetch.upstream_scheduler import BATCH, UpstreamUnavailableError, request_priority
+from src.helpers.settings.settings import get_settings
+from src.helpers.metrics.metrics import record_timing
+from src.schemas.batch_request import BatchRequest
 from src.schemas.full_data_request import FullDataRequest
+from src.schemas.movie_response import MovieDetails, MovieWithWeather, ReleaseDayWeather
 from src.schemas.partial_data_request import PartialDataRequest
-from src.services.movie_service import MovieService
+from src.services.movie_service import MovieNotFoundError, MovieService
+from src.utils.suggest_utils import suggest_titles
 from src.utils.webhook_utils import send_to_webhook
 
 
 class MovieController:
 
     @staticmethod
-    def search_movie_by_title(request: PartialDataRequest) -> dict:
+    async def search_movie_by_title(
+        request: PartialDataRequest,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated response fields to return, e.g. title,genres,release_date. All fields when omitted",
+        ),
+    ) -> ORJSONResponse:
         """
         This resource gets the detailed information of a movie based on the title.
 
         Args:
             request (PartialDataRequest): The request object containing the movie title and language.
+            fields (Optional[str]): Comma-separated movie fields to return; all of them when omitted.
 
         Returns:
-            dict: A dictionary containing the movie details and HTTP status code.
+            ORJSONResponse: The movie details, the extra data asked for with "include" and HTTP status code.
 
         Raises:
-            HTTPException: If the movie is not found (404) or if there is an internal server error (500).
+            HTTPException: If a requested field does not exist (400), if the movie is not found (404), if an upstream is unavailable (503), if the request's deadline passes (504) or if there is an internal server error (500).
         """
+        started = time.perf_counter()
         try:
-            movie = MovieService.search_movie_by_title(title=request.movie_title, language=request.language)
+            projection = MovieController.__parse_fields(MovieDetails, fields)
+            movie = await MovieService.search_movie_by_title(title=request.movie_title, language=request.language, include=request.include)
 
             if not movie:
                 raise HTTPException(status_code=404, detail="Movie not found")
 
             send_to_webhook(movie)
 
-            return {
-                "response": movie,
+            return ORJSONResponse(MovieController.__with_included({
+                "response": MovieDetails.from_dict(movie).project(projection),
                 "status": status.HTTP_200_OK
-            }
+            }, movie))
+        except HTTPException:
+            raise
+        except UpstreamUnavailableError as e:
+            raise MovieController.__unavailable(e)
+        except DeadlineExceededError as e:
+            raise MovieController.__timed_out(e)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            record_timing("handler", time.perf_counter() - started)
 
 
     @staticmethod
-    def get_movie_and_weather_data(request: FullDataRequest) -> dict:
+    async def get_movie_and_weather_data(
+        request: FullDataRequest,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated response fields to return, e.g. title,genres,release_date. All fields when omitted",
+        ),
+    ) -> ORJSONResponse:
         """
         Get movie and weather data based on the title.
 
         Args:
             request (FullDataRequest): The request object containing the movie title, language, latitude, longitude, start date, and end date.
+            fields (Optional[str]): Comma-separated movie fields to return; all of them when omitted.
 
         Returns:
-            dict: A dictionary containing the movie and weather data and HTTP status code.
+            ORJSONResponse: The movie and weather data, the extra data asked for with "include", the per-step timings in milliseconds and HTTP status code.
 
         Raises:
-            HTTPException: If there is an internal server error (500).
+            HTTPException: If a requested field does not exist (400), if the movie is not found (404), if an upstream is unavailable (503), if the request's deadline passes before the movie is found (504) or if there is an internal server error (500).
         """
+        started = time.perf_counter()
         try:
-            movie = MovieService.search_movie_by_title(title=request.movie_title, language=request.language)
-
-            movie_and_weather_data = MovieService.get_movie_and_weather_data(
-                title=movie['title'],
-                language=movie['original_language'],
+            projection = MovieController.__parse_fields(MovieWithWeather, fields)
+            movie_and_weather_data, timings = await MovieService.get_movie_and_weather_data(
+                title=request.movie_title,
+                language=request.language,
                 latitude=request.latitude,
                 longitude=request.longitude,
-                start_date=movie['release_date'],
-                end_date=movie['release_date']
+                include=request.include
             )
 
             send_to_webhook(movie_and_weather_data)
 
-            return {
-                "response": movie_and_weather_data,
+            return ORJSONResponse(MovieController.__with_included({
+                "response": MovieWithWeather.from_dict(movie_and_weather_data).project(projection),
+                "timings": timings,
                 "status": status.HTTP_200_OK
-            }
+            }, movie_and_weather_data))
+        except HTTPException:
+            raise
+        except MovieNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except UpstreamUnavailableError as e:
+            raise MovieController.__unavailable(e)
+        except DeadlineExceededError as e:
+            raise MovieController.__timed_out(e)
         except Exception as e:
             print(f"Error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            record_timing("handler", time.perf_counter() - started)
+
+
+    @staticmethod
+    async def search_movie_from_cache(request: PartialDataRequest, fields: Optional[str] = None) -> Optional[ORJSONResponse]:
+        """
+        Answers a search-movie request from the caches only, when the endpoint is overloaded.
+
+        Args:
+            request (PartialDataRequest): The request object containing the movie title and language.
+            fields (Optional[str]): Comma-separated movie fields to return; all of them when omitted.
+
+        Returns:
+            Optional[ORJSONResponse]: The cached (possibly stale) movie details marked "degraded", or None if they are not cached.
+
+        Raises:
+            HTTPException: If a requested field does not exist (400).
+        """
+        projection = MovieController.__parse_fields(MovieDetails, fields)
+        movie = MovieService.search_movie_from_cache(title=request.movie_title, language=request.language, include=request.include)
+
+        if not movie:
+            return None
+
+        return ORJSONResponse(MovieController.__with_included({
+            "response": MovieDetails.from_dict(movie).project(projection),
+            "status": status.HTTP_200_OK,
+            "degraded": True
+        }, movie))
+
+
+    @staticmethod
+    async def movie_and_weather_data_from_cache(request: FullDataRequest, fields: Optional[str] = None) -> Optional[ORJSONResponse]:
+        """
+        Answers a get-movie-and-weather-data request from the caches only, when the endpoint is overloaded.
+
+        Args:
+            request (FullDataRequest): The request object containing the movie title, language, latitude and longitude.
+            fields (Optional[str]): Comma-separated movie fields to return; all of them when omitted.
+
+        Returns:
+            Optional[ORJSONResponse]: The cached (possibly stale) movie and weather data marked "degraded", or None if the movie is not cached.
+
+        Raises:
+            HTTPException: If a requested field does not exist (400).
+        """
+        projection = MovieController.__parse_fields(MovieWithWeather, fields)
+        movie_and_weather_data = MovieService.movie_and_weather_data_from_cache(
+            title=request.movie_title,
+            language=request.language,
+            latitude=request.latitude,
+            longitude=request.longitude,
+            include=request.include
+        )
+
+        if not movie_and_weather_data:
+            return None
+
+        return ORJSONResponse(MovieController.__with_included({
+            "response": MovieWithWeather.from_dict(movie_and_weather_data).project(projection),
+            "status": status.HTTP_200_OK,
+            "degraded": True
+        }, movie_and_weather_data))
+
+
+    @staticmethod
+    async def stream_movie_and_weather_data(
+        request: FullDataRequest,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated response fields to return, e.g. title,genres,release_date. All fields when omitted",
+        ),
+        accept: Optional[str] = Header(None),
+    ) -> StreamingResponse:
+        """
+        Get movie and weather data based on the title, streaming each part as soon as it is ready.
+
+        The movie is sent as soon as it is resolved, followed by a "release_day_weather" event,
+        an "included" event when extra data was asked for, and a final "done" event with the
+        per-step timings. Clients that accept
+        ``text/event-stream`` get Server-Sent Events, everyone else newline-delimited JSON
+        objects of the form {"event": ..., "data": ...}.
+
+        Args:
+            request (FullDataRequest): The request object containing the movie title, language, latitude and longitude.
+            fields (Optional[str]): Comma-separated movie fields to return; all of them when omitted.
+            accept (Optional[str]): The Accept header, which selects the stream format.
+
+        Returns:
+            StreamingResponse: The movie, weather, included and done events. A failure after the movie was
+                               sent is reported as an "error" event with its own status.
+
+        Raises:
+            HTTPException: If a requested field does not exist (400), if the movie is not found (404), if an upstream is unavailable (503), if the request's deadline passes (504) or if there is an internal server error (500).
+        """
+        started = time.perf_counter()
+        try:
+            projection = MovieController.__parse_fields(MovieWithWeather, fields)
+            events = MovieService.stream_movie_and_weather_data(
+                title=request.movie_title,
+                language=request.language,
+                latitude=request.latitude,
+                longitude=request.longitude,
+                include=request.include
+            )
+            # Wait for the movie itself, so that a missing movie or an unavailable
+            # upstream is still answered with its own status code.
+            first_event = await anext(events)
+        except HTTPException:
+            raise
+        except MovieNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except UpstreamUnavailableError as e:
+            raise MovieController.__unavailable(e)
+        except DeadlineExceededError as e:
+            raise MovieController.__timed_out(e)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            record_timing("handler", time.perf_counter() - started)
+
+        if "text/event-stream" in (accept or ""):
+            encode, media_type = MovieController.__encode_sse, "text/event-stream"
+        else:
+            encode, media_type = MovieController.__encode_ndjson, "application/x-ndjson"
+
+        return StreamingResponse(
+            MovieController.__stream_movie_events(first_event, events, projection, encode),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+    @staticmethod
+    async def __stream_movie_events(
+        first_event: tuple[str, dict],
+        events: AsyncIterator[tuple[str, dict]],
+        projection: Optional[tuple],
+        encode: Callable[[str, object], bytes],
+    ) -> AsyncIterator[bytes]:
+        movie_fields = tuple(
+            name for name in projection or MovieWithWeather.__dataclass_fields__ if name != "release_day_weather"
+        )
+        with_weather = projection is None or "release_day_weather" in projection
+        movie_data = {}
+
+        async def chain() -> AsyncIterator[tuple[str, dict]]:
+            yield first_event
+            async for event in events:
+                yield event
+
+        try:
+            async for event, data in chain():
+                if event == 'movie':
+                    movie_data = data
+                    yield encode("movie", MovieWithWeather.from_dict(data).project(movie_fields))
+                elif event == 'release_day_weather':
+                    movie_data['release_day_weather'] = data
+                    if with_weather:
+                        yield encode("release_day_weather", ReleaseDayWeather.from_dict(data))
+                elif event == 'included':
+                    movie_data['included'] = data
+                    yield encode("included", data)
+                else:
+                    send_to_webhook(movie_data)
+                    yield encode("done", {"timings": data, "status": status.HTTP_200_OK})
+        except UpstreamUnavailableError as e:
+            yield encode("error", {"status": status.HTTP_503_SERVICE_UNAVAILABLE, "detail": str(e)})
+        except DeadlineExceededError as e:
+            yield encode("error", {"status": status.HTTP_504_GATEWAY_TIMEOUT, "detail": str(e)})
+        except Exception as e:
+            print(f"Error: {e}")
+            yield encode("error", {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": str(e)})
+        finally:
+            await events.aclose()
+
+
+    @staticmethod
+    def __encode_ndjson(event: str, data: object) -> bytes:
+        return orjson.dumps({"event": event, "data": data}) + b"\n"
+
+
+    @staticmethod
+    def __encode_sse(event: str, data: object) -> bytes:
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+    @staticmethod
+    async def suggest(
+        q: str = Query(..., min_length=1, max_length=100, description="The title prefix typed so far", examples=["incep"]),
+        limit: int = Query(
+            10,
+            ge=1,
+            le=get_settings().suggest_max_limit,
+            description="Maximum number of suggestions",
+        ),
+    ) -> ORJSONResponse:
+        """
+        Suggest movie titles for a prefix, for search-as-you-type.
+
+        Served from memory only: no TMDB call and no webhook.
+
+        Args:
+            q (str): The title prefix typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            ORJSONResponse: The suggestions, most popular first, cacheable by clients for SUGGEST_MAX_AGE seconds.
+        """
+        started = time.perf_counter()
+        suggestions = suggest_titles(q, limit)
+        record_timing("suggest", time.perf_counter() - started)
+
+        return ORJSONResponse(
+            {"query": q, "suggestions": suggestions},
+            headers={"Cache-Control": f"public, max-age={get_settings().suggest_max_age}"},
+        )
+
+
+    @staticmethod
+    def __with_included(body: dict, movie: dict) -> dict:
+        if 'included' in movie:
+            body["included"] = movie['included']
+        return body
+
+
+    @staticmethod
+    def __parse_fields(model: type, fields: Optional[str]) -> Optional[tuple]:
+        try:
+            return model.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+    @staticmethod
+    def __unavailable(error: UpstreamUnavailableError) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(error),
+            headers={"Retry-After": str(max(1, round(error.retry_after)))},
+        )
+
+
+    @staticmethod
+    def __timed_out(error: DeadlineExceededError) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(error))
+
+
+    @staticmethod
+    async def batch(request: BatchRequest) -> StreamingResponse:
+        """
+        Resolve many movies concurrently and stream each result as soon as it is ready.
+
+        Args:
+            request (BatchRequest): The items to resolve and an optional concurrency limit.
+
+        Each item in flight holds one slot of the "batch" route's AdmissionController,
+        so ADMISSION_ROUTE_LIMITS bounds the upstream load of all batches together.
+
+        Returns:
+            StreamingResponse: Newline-delimited JSON, one object per item in completion order,
+                               each carrying its own "index" and "status". An item that is shed
+                               by admission control gets a 503.
+        """
+        concurrency = request.concurrency or get_settings().batch_concurrency
+
+        return StreamingResponse(
+            MovieController.__stream_batch(request.items, concurrency),
+            media_type="application/x-ndjson",
+        )
+
+
+    @staticmethod
+    async def __stream_batch(items: list, concurrency: int) -> AsyncIterator[bytes]:
+        semaphore = asyncio.Semaphore(concurrency)
+        admission = AdmissionController.for_route("batch")
+        # Batch items queue behind interactive requests for upstream rate limit tokens.
+        request_priority.set(BATCH)
+        # Each item gets the request's time budget from the moment it starts, not a share of it.
+        current = request_deadline.get()
+        timeout = current.timeout if current is not None else None
+
+        async def resolve(index: int, item: PartialDataRequest | FullDataRequest) -> dict:
+            async with semaphore:
+                with deadline(timeout):
+                    try:
+                        granted = await admission.acquire()
+                    except AdmissionRejectedError as e:
+                        return {"index": index, "status": status.HTTP_503_SERVICE_UNAVAILABLE, "detail": str(e), "retry_after": round(e.retry_after)}
+                    try:
+                        return await MovieController.__resolve_batch_item(index, item)
+                    finally:
+                        admission.release(granted)
+
+        tasks = [asyncio.create_task(resolve(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield orjson.dumps(await next_result) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+    @staticmethod
+    async def __resolve_batch_item(index: int, item: PartialDataRequest | FullDataRequest) -> dict:
+        try:
+            if isinstance(item, FullDataRequest):
+                data, _ = await MovieService.get_movie_and_weather_data(
+                    title=item.movie_title,
+                    language=item.language,
+                    latitude=item.latitude,
+                    longitude=item.longitude,
+                    include=item.include
+                )
+            else:
+                data = await MovieService.search_movie_by_title(title=item.movie_title, language=item.language, include=item.include)
+
+            if not data:
+                return {"index": index, "status": status.HTTP_404_NOT_FOUND, "detail": "Movie not found"}
+
+            send_to_webhook(data)
+
+            model = MovieWithWeather if isinstance(item, FullDataRequest) else MovieDetails
+            return MovieController.__with_included({"index": index, "status": status.HTTP_200_OK, "response": model.from_dict(data)}, data)
+        except MovieNotFoundError as e:
+            return {"index": index, "status": status.HTTP_404_NOT_FOUND, "detail": str(e)}
+        except UpstreamUnavailableError as e:
+            return {"index": index, "status": status.HTTP_503_SERVICE_UNAVAILABLE, "detail": str(e)}
+        except DeadlineExceededError as e:
+            return {"index": index, "status": status.HTTP_504_GATEWAY_TIMEOUT, "detail": str(e)}
+        except Exception as e:
+            return {"index": index, "status": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": str(e)}
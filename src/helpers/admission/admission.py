@@ -0,0 +1,237 @@
+import asyncio
+import functools
+import math
+import time
+
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+
+from src.helpers.fetch.deadline import remaining_time
+from src.helpers.metrics.metrics import admission_shed, admission_wait_seconds
+from src.helpers.settings.settings import get_settings
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+class AdmissionRejectedError(Exception):
+    """
+    Raised when a route is saturated and a request is shed instead of queued.
+    """
+
+    def __init__(self, route: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"The {route} endpoint is overloaded ({reason.replace('_', ' ')}), retry in {retry_after:.0f}s.")
+        self.route = route
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits how many requests of one route run at the same time.
+
+    Up to ``max_concurrency`` requests run; the next ``max_queue`` wait in FIFO
+    order for at most ``max_queue_wait`` seconds (less if their deadline is
+    closer). Anything beyond that is rejected at once, so a burst costs a quick
+    503 instead of latency for everyone and work nobody waits for any more.
+    """
+    _controllers: Dict[str, "AdmissionController"] = {}
+
+    def __init__(self, route: str, max_concurrency: int, max_queue: int, max_queue_wait: float) -> None:
+        self.route = route
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.__in_flight = 0
+        self.__waiters: deque = deque()
+        # Moving average of how long a request holds its slot, for Retry-After.
+        self.__service_time = 0.0
+
+        self.admitted = 0
+        self.shed = 0
+        self.degraded = 0
+
+    @classmethod
+    def for_route(cls, route: str) -> "AdmissionController":
+        """
+        Returns the controller of a route, creating it from the settings on first use.
+
+        ADMISSION_ROUTE_LIMITS can override the default concurrency per route, e.g. "batch=4,get-movie-and-weather-data=32".
+
+        Args:
+            route (str): The route name.
+        Returns:
+            AdmissionController: The route's controller.
+        """
+        controller = cls._controllers.get(route)
+        if controller is None:
+            settings = get_settings()
+            controller = cls._controllers[route] = cls(
+                route=route,
+                max_concurrency=int(settings.admission_route_limits.get(route, settings.admission_max_concurrency)),
+                max_queue=settings.admission_max_queue,
+                max_queue_wait=settings.admission_max_queue_wait,
+            )
+        return controller
+
+    @classmethod
+    def all(cls) -> Dict[str, "AdmissionController"]:
+        return cls._controllers
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': self.__in_flight,
+            'queued': len(self.__waiters),
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'degraded': self.degraded,
+        }
+
+    def retry_after(self) -> float:
+        """
+        Estimates when a slot should be free: the queue ahead, drained at the current service rate.
+
+        Returns:
+            float: Seconds, at least 1.
+        """
+        return max(1.0, math.ceil(self.__service_time * (len(self.__waiters) + 1) / self.max_concurrency))
+
+    async def acquire(self) -> float:
+        """
+        Waits for a slot.
+
+        Returns:
+            float: When the slot was granted (time.monotonic()), to be passed to ``release``.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait budget runs out.
+        """
+        started = time.monotonic()
+        if self.__in_flight < self.max_concurrency and not self.__waiters:
+            self.__in_flight += 1
+            return self.__admit(started)
+
+        if len(self.__waiters) >= self.max_queue:
+            self.__reject(QUEUE_FULL, started)
+
+        budget = self.max_queue_wait
+        remaining = remaining_time()
+        if remaining is not None:
+            budget = min(budget, remaining)
+
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters.append(future)
+        try:
+            async with asyncio.timeout(budget):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended.
+                if isinstance(e, asyncio.CancelledError):
+                    self.release(time.monotonic())
+                    raise
+                return self.__admit(started)
+            if future in self.__waiters:
+                self.__waiters.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.__reject(QUEUE_TIMEOUT, started)
+
+        return self.__admit(started)
+
+    def release(self, granted: float) -> None:
+        """
+        Frees a slot, handing it straight to the next waiting request if there is one.
+
+        Args:
+            granted (float): What ``acquire`` returned.
+        """
+        self.__service_time += (time.monotonic() - granted - self.__service_time) * 0.1
+
+        while self.__waiters:
+            future = self.__waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.__in_flight -= 1
+
+    async def release_after(self, body: AsyncIterator[bytes], granted: float) -> AsyncIterator[bytes]:
+        """
+        Keeps the slot while a streamed response is sent and frees it when the stream ends.
+
+        Args:
+            body (AsyncIterator[bytes]): The response body.
+            granted (float): What ``acquire`` returned.
+        Yields:
+            bytes: The body chunks.
+        """
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self.release(granted)
+
+    def __admit(self, started: float) -> float:
+        now = time.monotonic()
+        self.admitted += 1
+        admission_wait_seconds.observe(now - started, self.route)
+        return now
+
+    def __reject(self, reason: str, started: float) -> None:
+        self.shed += 1
+        admission_wait_seconds.observe(time.monotonic() - started, self.route)
+        admission_shed.inc(self.route, reason)
+        raise AdmissionRejectedError(self.route, reason, self.retry_after())
+
+
+def admission_controlled(
+    route: str,
+    endpoint: Callable[..., Awaitable[Any]],
+    fallback: Optional[Callable[..., Awaitable[Optional[Response]]]] = None,
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Wraps a route endpoint with the route's AdmissionController.
+
+    A shed request is answered by ``fallback`` when it can produce a degraded
+    answer (e.g. from the caches), otherwise with a 503 and Retry-After.
+
+    Args:
+        route (str): The route name, also the key of ADMISSION_ROUTE_LIMITS.
+        endpoint (Callable[..., Awaitable[Any]]): The endpoint; its signature is kept for FastAPI.
+        fallback (Optional[Callable[..., Awaitable[Optional[Response]]]]): Called with the endpoint's
+            arguments when the request is shed; returns a response or None.
+    Returns:
+        Callable[..., Awaitable[Any]]: The wrapped endpoint.
+    """
+    @functools.wraps(endpoint)
+    async def admitted(*args, **kwargs) -> Any:
+        admission = AdmissionController.for_route(route)
+        try:
+            granted = await admission.acquire()
+        except AdmissionRejectedError as e:
+            if fallback is not None:
+                response = await fallback(*args, **kwargs)
+                if response is not None:
+                    admission.degraded += 1
+                    return response
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": str(round(e.retry_after))},
+            )
+
+        streaming = False
+        try:
+            response = await endpoint(*args, **kwargs)
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = admission.release_after(response.body_iterator, granted)
+                streaming = True
+            return response
+        finally:
+            if not streaming:
+                admission.release(granted)
+
+    return admitted
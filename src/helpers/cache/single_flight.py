@@ -0,0 +1,55 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.helpers.fetch.deadline import shared_context, within_deadline
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight call.
+
+    The first caller starts the work; everyone arriving while it runs awaits the
+    same result (or exception). The work runs as its own task under its own
+    deadline, so a caller that is cancelled or runs out of time does not cancel
+    it for the others.
+    """
+
+    def __init__(self) -> None:
+        self.__calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self.__calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs ``fn`` once for all concurrent callers sharing ``key``.
+
+        Args:
+            key (Hashable): Identifies identical work.
+            fn (Callable[[], Awaitable[Any]]): Coroutine factory doing the work.
+        Returns:
+            Any: The shared result.
+        Raises:
+            DeadlineExceededError: If the caller's deadline passes first.
+        """
+        task = self.__calls.get(key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.get_running_loop().create_task(fn(), context=shared_context())
+            self.__calls[key] = task
+            task.add_done_callback(lambda done: self.__finish(key, done))
+        else:
+            self.coalesced += 1
+
+        return await within_deadline(asyncio.shield(task))
+
+    def __finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.__calls.get(key) is task:
+            del self.__calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            task.exception()
@@ -0,0 +1,249 @@
+import asyncio
+import marshal
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+from functools import lru_cache
+from typing import Any
+
+from src.helpers.settings.settings import get_settings
+
+# Bump when the payload encoding changes.
+_ENCODING_VERSION = 1
+# marshal data is only guaranteed to load on the Python version that wrote it, so the
+# file is stamped with that version too: 3.11 with encoding 1 is 31101.
+_FORMAT_VERSION = (sys.version_info.major * 100 + sys.version_info.minor) * 100 + _ENCODING_VERSION
+
+_RAW = b"m"
+_COMPRESSED = b"z"
+
+
+def _encode(value: Any, compress_over: int) -> bytes:
+    payload = marshal.dumps(value)
+    if len(payload) > compress_over:
+        return _COMPRESSED + zlib.compress(payload, 1)
+    return _RAW + payload
+
+
+def _decode(blob: bytes) -> Any:
+    kind, payload = blob[:1], blob[1:]
+    if kind == _COMPRESSED:
+        payload = zlib.decompress(payload)
+    return marshal.loads(payload)
+
+
+class SQLiteCache:
+    """
+    Host-wide cache shared by every worker process, persisted in a SQLite file in WAL mode.
+
+    Values are plain data (dicts, lists, tuples, str, numbers) stored as compact
+    marshal blobs, zlib-compressed above ``compress_over`` bytes. Every entry keeps
+    its absolute expiry time, and the file is trimmed back under ``max_bytes``,
+    least recently used first. Calls block briefly, so async callers should run
+    them in a thread. The entry and byte totals in ``stats`` are recounted in the
+    background at most every ``stats_interval`` seconds (and after each eviction
+    pass), so monitoring never scans the table on the event loop.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, compress_over: int = 1024, evict_every: int = 256, stats_interval: float = 30.0) -> None:
+        self.__path = path
+        self.__max_bytes = max_bytes
+        self.__compress_over = compress_over
+        self.__evict_every = evict_every
+        self.__stats_interval = stats_interval
+        self.__local = threading.local()
+        self.__writes = 0
+        self.__lock = threading.Lock()
+        # (entries, bytes) as last counted, when, and whether a recount is running.
+        self.__totals = (0, 0)
+        self.__totals_at = 0.0
+        self.__counting = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__setup()
+
+    def __connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.__path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.__local.connection = connection
+        return connection
+
+    def __setup(self) -> None:
+        connection = self.__connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != _FORMAT_VERSION:
+            # Payloads written by another Python version cannot be decoded; start clean.
+            connection.execute("DELETE FROM entries")
+            connection.execute(f"PRAGMA user_version={_FORMAT_VERSION}")
+
+        self.__count()
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of this process and the totals of the whole file, as last counted.
+
+        Returns:
+            dict: hits, misses, evictions, entries and bytes.
+        """
+        with self.__lock:
+            due = not self.__counting and time.monotonic() - self.__totals_at >= self.__stats_interval
+            if due:
+                self.__counting = True
+        if due:
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self.__count)
+            except RuntimeError:
+                self.__count()
+
+        count, size = self.__totals
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': count,
+            'bytes': size,
+        }
+
+    def __count(self) -> None:
+        try:
+            count, size = self.__connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            self.__totals = (count, size)
+        except sqlite3.Error as e:
+            print(f"Error: Unable to count the shared cache entries: {e}")
+        finally:
+            with self.__lock:
+                self.__totals_at = time.monotonic()
+                self.__counting = False
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        """
+        Reads a fresh entry.
+
+        Args:
+            key (str): The cache key.
+        Returns:
+            tuple[Any, float] | None: The value and its remaining TTL in seconds (``inf`` if it never expires),
+                                      or None if it is missing, expired or unreadable.
+        """
+        now = time.time()
+        row = self.__connection().execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or (row[1] is not None and row[1] <= now):
+            self.misses += 1
+            return None
+
+        try:
+            value = _decode(row[0])
+        except (ValueError, EOFError, TypeError, zlib.error):
+            self.misses += 1
+            return None
+
+        # Refreshing the LRU clock on every read would turn reads into writes.
+        if now - row[2] > 60:
+            self.__connection().execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        self.hits += 1
+        return value, (float("inf") if row[1] is None else row[1] - now)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Writes an entry.
+
+        Args:
+            key (str): The cache key.
+            value (Any): Plain data to store.
+            ttl (float): Seconds until the entry expires, ``inf`` for entries that never expire.
+        """
+        now = time.time()
+        blob = _encode(value, self.__compress_over)
+        expires_at = None if ttl == float("inf") else now + ttl
+
+        self.__connection().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, blob, expires_at, len(blob) + len(key), now),
+        )
+
+        with self.__lock:
+            self.__writes += 1
+            due = self.__writes % self.__evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Drops expired entries, then the least recently used ones until the file is under ``max_bytes``.
+        """
+        connection = self.__connection()
+        self.evictions += connection.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+
+        count, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        target = self.__max_bytes * 0.9
+
+        while total > self.__max_bytes:
+            rows = connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 500"
+            ).fetchall()
+            if not rows:
+                break
+
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                total -= size
+                if total <= target:
+                    break
+
+            connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+            count -= len(victims)
+            if total <= target:
+                break
+
+        with self.__lock:
+            self.__totals = (count, total)
+            self.__totals_at = time.monotonic()
+
+
+@lru_cache(maxsize=None)
+def get_shared_cache() -> SQLiteCache | None:
+    """
+    Returns the host-wide cache configured by SHARED_CACHE_PATH, or None when it is not enabled.
+
+    Returns:
+        SQLiteCache | None: The shared cache backend.
+    """
+    settings = get_settings()
+    if not settings.shared_cache_path:
+        return None
+
+    return SQLiteCache(
+        path=settings.shared_cache_path,
+        max_bytes=settings.shared_cache_max_bytes,
+    )
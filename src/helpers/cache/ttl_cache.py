@@ -0,0 +1,290 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.helpers.cache.single_flight import SingleFlight
+from src.helpers.fetch.deadline import shared_context
+
+
+_MISSING = object()
+
+
+def _approx_size(value: Any) -> int:
+    return len(repr(value))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until", "size")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, size: int) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.size = size
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with TTL expiry, LRU eviction and stale-while-revalidate.
+
+    Entries live for ``ttl`` seconds (``negative_ttl`` for "not found" results) and
+    can then be served for another ``stale_ttl`` seconds while a single background
+    refresh replaces them. The cache is capped both by entry count and by an
+    approximate size in bytes; the least recently used entries are evicted first.
+    Concurrent misses for the same key share a single load.
+
+    An optional ``backend`` (such as the host-wide SQLiteCache) acts as a second
+    level: misses are looked up there before loading, and every stored value is
+    written through to it under ``namespace``.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        negative_ttl: float | None = None,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1024,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = _approx_size,
+        is_negative: Callable[[Any], bool] = lambda value: not value,
+        backend: Any = None,
+        namespace: str = "",
+    ) -> None:
+        self.__ttl = ttl
+        self.__negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.__stale_ttl = stale_ttl
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__sizeof = sizeof
+        self.__is_negative = is_negative
+        self.__backend = backend
+        self.__namespace = namespace
+
+        self.__entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.__bytes = 0
+        self.__refreshing: dict[Hashable, asyncio.Task] = {}
+        self.__in_flight = SingleFlight()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.served_on_error = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters and current footprint.
+
+        Returns:
+            dict: Hits, stale hits, negative hits, misses, evictions, entries and approximate bytes.
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        stats = {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'served_on_error': self.served_on_error,
+            'coalesced': self.__in_flight.coalesced,
+            'entries': len(self.__entries),
+            'bytes': self.__bytes,
+            'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+        if self.__backend is not None:
+            stats['backend'] = self.__backend.stats()
+        return stats
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Stores a value, using the negative TTL when the value is a "not found" result.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+            ttl (float | None): Overrides the cache TTL for this entry. Use ``math.inf`` for entries that never expire.
+        """
+        if ttl is None:
+            ttl = self.__negative_ttl if self.__is_negative(value) else self.__ttl
+
+        self.__store(key, value, ttl)
+        if self.__backend is not None:
+            self.__write_through(key, value, ttl)
+
+    def __store(self, key: Hashable, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        size = self.__sizeof(value)
+
+        previous = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__bytes -= previous.size
+
+        self.__entries[key] = _Entry(value, now + ttl, now + ttl + self.__stale_ttl, size)
+        self.__bytes += size
+        self.__evict()
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns a value even if it is stale, without touching counters or LRU order.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): Returned when the key is absent.
+        Returns:
+            Any: The cached value or the default.
+        """
+        entry = self.__entries.get(key)
+        return default if entry is None else entry.value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns a fresh value, or the default if the key is absent or expired.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): Returned on a miss.
+        Returns:
+            Any: The cached value or the default.
+        """
+        entry = self.__lookup(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self.misses += 1
+            return default
+
+        self.__count_hit(entry)
+        return entry.value
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Like ``get``, but falls back to the backend on an in-process miss.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Any): Returned on a miss.
+        Returns:
+            Any: The cached value or the default.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = await self.__backend_get(key)
+        return default if value is _MISSING else value
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached value, loading it on a miss.
+
+        Concurrent misses for the same key are coalesced into one call to ``loader``.
+        A stale entry is returned immediately while one background refresh reloads it.
+        If the load fails and an expired entry is still held, that entry is served instead.
+
+        Args:
+            key (Hashable): The cache key.
+            loader (Callable[[], Awaitable[Any]]): Coroutine factory producing the value.
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        entry = self.__lookup(key)
+        now = time.monotonic()
+
+        if entry is not None and entry.expires_at > now:
+            self.__count_hit(entry)
+            return entry.value
+
+        if entry is not None and entry.stale_until > now:
+            self.stale_hits += 1
+            self.__refresh_in_background(key, loader)
+            return entry.value
+
+        self.misses += 1
+        try:
+            return await self.__in_flight.do(key, lambda: self.__load(key, loader))
+        except Exception:
+            expired = self.__entries.get(key)
+            if expired is None:
+                raise
+            self.served_on_error += 1
+            return expired.value
+
+    async def __load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.__backend_get(key)
+        if value is not _MISSING:
+            return value
+
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def __backend_key(self, key: Hashable) -> str:
+        return f"{self.__namespace}:{key!r}"
+
+    async def __backend_get(self, key: Hashable) -> Any:
+        if self.__backend is None:
+            return _MISSING
+
+        try:
+            found = await asyncio.to_thread(self.__backend.get, self.__backend_key(key))
+        except Exception as e:
+            print(f"Error: Shared cache read failed: {e}")
+            return _MISSING
+
+        if found is None:
+            return _MISSING
+
+        value, ttl = found
+        self.__store(key, value, ttl)
+        return value
+
+    def __write_through(self, key: Hashable, value: Any, ttl: float) -> None:
+        def report(future) -> None:
+            if future.exception() is not None:
+                print(f"Error: Shared cache write failed: {future.exception()}")
+
+        future = asyncio.get_running_loop().run_in_executor(None, self.__backend.set, self.__backend_key(key), value, ttl)
+        future.add_done_callback(report)
+
+    def __lookup(self, key: Hashable) -> _Entry | None:
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+
+        self.__entries.move_to_end(key)
+        if entry.stale_until <= time.monotonic():
+            # Expired entries stay (until evicted) so they can be served if a reload fails.
+            return None
+        return entry
+
+    def __count_hit(self, entry: _Entry) -> None:
+        self.hits += 1
+        if self.__is_negative(entry.value):
+            self.negative_hits += 1
+
+    def __refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self.__refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self.__in_flight.do(key, lambda: self.__load(key, loader))
+            except Exception as e:
+                print(f"Error: Background cache refresh failed: {e}")
+            finally:
+                self.__refreshing.pop(key, None)
+
+        self.__refreshing[key] = asyncio.get_running_loop().create_task(refresh(), context=shared_context())
+
+    def __evict(self) -> None:
+        while self.__entries and (
+            len(self.__entries) > self.__max_entries
+            or (self.__max_bytes is not None and self.__bytes > self.__max_bytes)
+        ):
+            _, entry = self.__entries.popitem(last=False)
+            self.__bytes -= entry.size
+            self.evictions += 1
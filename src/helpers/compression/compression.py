@@ -0,0 +1,34 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Responses sent event by event; a compressor would hold them back until its buffer fills.
+STREAMING_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+
+
+class StreamingAwareGZipResponder(GZipResponder):
+    """
+    GZipResponder that passes streaming media types through uncompressed.
+    """
+
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "").partition(";")[0].strip()
+            if media_type in STREAMING_MEDIA_TYPES:
+                # Handled like a response that is already encoded: sent as is.
+                self.content_encoding_set = True
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves newline-delimited JSON and Server-Sent Events uncompressed,
+    so that each line reaches the client as soon as it is sent.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = StreamingAwareGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,194 @@
+import asyncio
+import re
+import time
+import httpx
+
+from urllib.parse import urlsplit
+
+from src.helpers.fetch.deadline import within_deadline
+from src.helpers.fetch.http_pool import HttpPool
+from src.helpers.fetch.upstream_scheduler import UpstreamScheduler, UpstreamUnavailableError, parse_retry_after
+from src.helpers.metrics.metrics import record_timing, upstream_request_seconds, upstream_response_bytes
+from src.helpers.settings.settings import get_settings
+
+# Numeric path segments (ids) collapse to "{id}" to keep metric labels bounded.
+# The first segment is left alone, so API versions like "/3" stay as they are.
+_ID_SEGMENT = re.compile(r"(?<=.)/\d+(?=/|$)")
+
+
+class AsyncDataFetch:
+    def __init__(self, url: str, extra_url: str="", params: dict | None=None, data: dict | list | None=None):
+        self.__url = url + extra_url
+        self.__params = params if params is not None else {}
+        self.__data = data
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def params(self) -> dict:
+        return self.__params
+
+    @property
+    def data(self) -> dict | list | None:
+        return self.__data
+
+    @url.setter
+    def url(self, value: str) -> None:
+        self.__url = value
+
+    @params.setter
+    def params(self, value: dict) -> None:
+        self.__params = value
+
+    @data.setter
+    def data(self, value: dict | list | None) -> None:
+        self.__data = value
+
+    def __validate_response(self, response: httpx.Response) -> dict:
+        if response.status_code == 200:
+            return response.json()
+        else:
+            response.raise_for_status()
+
+    async def __send(self, method: str, host: str, route: str, **kwargs) -> httpx.Response:
+        client = HttpPool.client_for(self.__url)
+        status = "error"
+        started = time.perf_counter()
+
+        try:
+            response = await client.request(method, self.__url, **kwargs)
+            status = str(response.status_code)
+            upstream_response_bytes.observe(len(response.content), host, route)
+            return response
+        except asyncio.CancelledError:
+            # Abandoned at the deadline or as the losing half of a hedge.
+            status = "cancelled"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            upstream_request_seconds.observe(duration, host, route, status)
+            record_timing("upstream", duration, f"{method} {host}{route} {status}")
+
+    async def __send_hedged(self, scheduler: UpstreamScheduler, host: str, route: str, **kwargs) -> httpx.Response:
+        """
+        Sends a GET and, if it has not answered within the route's usual latency
+        (HEDGE_PERCENTILE of its successful calls), a duplicate of it. The first
+        answer wins and the other attempt is cancelled.
+
+        The duplicate needs a rate limit token that is free right away, so hedging
+        never delays other calls or pushes an upstream over its limit.
+        """
+        delay = self.__hedge_delay(host, route)
+        if delay is None:
+            return await self.__send("GET", host, route, **kwargs)
+
+        attempts = [asyncio.ensure_future(self.__send("GET", host, route, **kwargs))]
+        try:
+            await asyncio.wait(attempts, timeout=delay)
+            if not attempts[0].done() and scheduler.bucket.try_take():
+                scheduler.hedged += 1
+                attempts.append(asyncio.ensure_future(self.__send("GET", host, route, **kwargs)))
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # An attempt can end cancelled (e.g. its connection was torn down); .exception() would raise.
+                answered = [attempt for attempt in done if not attempt.cancelled() and attempt.exception() is None]
+                if answered:
+                    return answered[0].result()
+
+            # No attempt answered: report a real failure rather than a cancellation.
+            failed = [attempt for attempt in attempts if not attempt.cancelled()]
+            return await (failed[0] if failed else attempts[0])
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+                # A losing attempt may still fail; nobody is waiting for its error.
+                attempt.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    @staticmethod
+    def __hedge_delay(host: str, route: str) -> float | None:
+        settings = get_settings()
+        if settings.hedge_percentile is None:
+            return None
+
+        latency = upstream_request_seconds.percentile(settings.hedge_percentile, host, route, "200")
+        if latency is None or latency == float("inf"):
+            return None
+        return max(settings.hedge_min_delay, latency)
+
+    async def __request(self, method: str, **kwargs) -> httpx.Response:
+        """
+        Sends the request through the host's UpstreamScheduler, within the current request's deadline.
+
+        GETs are retried on 429/5xx and connection errors with backoff, honouring
+        Retry-After, and hedged when HEDGE_PERCENTILE is set. A long Retry-After or
+        an open circuit fails fast.
+
+        Raises:
+            UpstreamUnavailableError: If the upstream is throttling us or its circuit breaker is open.
+            DeadlineExceededError: If the request's deadline passes before an answer.
+        """
+        return await within_deadline(self.__attempt(method, **kwargs))
+
+    async def __attempt(self, method: str, **kwargs) -> httpx.Response:
+        parts = urlsplit(self.__url)
+        route = _ID_SEGMENT.sub("/{id}", parts.path) or "/"
+        scheduler = UpstreamScheduler.for_host(parts.netloc)
+        attempts = scheduler.max_retries + 1 if method == "GET" else 1
+        max_retry_wait = get_settings().upstream_max_retry_wait
+
+        for attempt in range(attempts):
+            try:
+                await scheduler.acquire()
+                if method == "GET":
+                    response = await self.__send_hedged(scheduler, parts.netloc, route, **kwargs)
+                else:
+                    response = await self.__send(method, parts.netloc, route, **kwargs)
+            except httpx.TransportError:
+                scheduler.breaker.record_failure()
+                if attempt + 1 == attempts:
+                    raise
+                await asyncio.sleep(scheduler.backoff(attempt, None))
+                continue
+            except asyncio.CancelledError:
+                scheduler.breaker.record_abandoned()
+                raise
+
+            if response.status_code != 429 and response.status_code < 500:
+                scheduler.breaker.record_success()
+                return response
+
+            if response.status_code == 429:
+                # Throttling means the host is alive; only 5xx count against the breaker.
+                scheduler.breaker.record_success()
+            else:
+                scheduler.breaker.record_failure()
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if attempt + 1 < attempts and (retry_after is None or retry_after <= max_retry_wait):
+                await asyncio.sleep(scheduler.backoff(attempt, retry_after))
+                continue
+
+            if response.status_code == 429:
+                scheduler.bucket.drain(retry_after or 1.0)
+                raise UpstreamUnavailableError(parts.netloc, "rate limited", retry_after or 1.0)
+            return response
+
+    async def get(self) -> dict:
+        response = await self.__request("GET", params=self.__params)
+        return self.__validate_response(response)
+
+    async def post(self) -> dict:
+        response = await self.__request("POST", json=self.__data)
+        return self.__validate_response(response)
+
+    async def put(self) -> dict:
+        response = await self.__request("PUT", json=self.__data)
+        return self.__validate_response(response)
+
+    async def delete(self) -> dict:
+        response = await self.__request("DELETE", json=self.__data)
+        return self.__validate_response(response)
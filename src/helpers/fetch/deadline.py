@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import time
+
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, TypeVar
+
+from src.helpers.settings.settings import get_settings
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+
+class DeadlineExceededError(Exception):
+    """
+    Raised when the current request runs out of time while waiting for an upstream.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"The request did not complete within its {timeout:g}s deadline.")
+        self.timeout = timeout
+
+
+class Deadline:
+    """
+    The point in time by which the current request has to be answered.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+# Deadline of the request being served; None outside of requests (startup, background jobs).
+request_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline(timeout: float | None) -> Iterator[Deadline | None]:
+    """
+    Runs the enclosed code under a deadline of ``timeout`` seconds from now.
+
+    Args:
+        timeout (float | None): The time budget in seconds, or None for no deadline.
+    Yields:
+        Deadline | None: The deadline in effect.
+    """
+    current = Deadline(timeout) if timeout is not None else None
+    token = request_deadline.set(current)
+    try:
+        yield current
+    finally:
+        request_deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """
+    Returns the time left before the current request's deadline.
+
+    Returns:
+        float | None: The remaining seconds, or None if there is no deadline.
+    """
+    current = request_deadline.get()
+    return None if current is None else current.remaining()
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Awaits ``awaitable``, giving up when the current request's deadline passes.
+
+    Args:
+        awaitable (Awaitable[T]): What to wait for; it is cancelled at the deadline.
+    Returns:
+        T: Its result.
+
+    Raises:
+        DeadlineExceededError: If the deadline passes first.
+    """
+    current = request_deadline.get()
+    if current is None:
+        return await awaitable
+
+    try:
+        async with asyncio.timeout(current.remaining()):
+            return await awaitable
+    except TimeoutError:
+        raise DeadlineExceededError(current.timeout) from None
+
+
+def shared_context() -> contextvars.Context:
+    """
+    Returns a copy of the current context for work shared by several requests.
+
+    Shared work (a coalesced upstream call, a background refresh) must not be cut
+    short by the deadline of whichever request happened to start it, so it runs
+    under the longest deadline a request may ask for; every waiting request still
+    gives up at its own.
+
+    Returns:
+        contextvars.Context: The context to run the shared work in.
+    """
+    context = contextvars.copy_context()
+    context.run(request_deadline.set, Deadline(get_settings().request_max_timeout))
+    return context
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that gives every request a deadline.
+
+    The budget is REQUEST_TIMEOUT seconds unless the client asks for another one
+    with an ``X-Request-Timeout`` header (in seconds, at most REQUEST_MAX_TIMEOUT).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        settings = get_settings()
+        self.__default_timeout = settings.request_timeout
+        self.__max_timeout = settings.request_max_timeout
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline(self.__timeout_for(scope)):
+            await self.app(scope, receive, send)
+
+    def __timeout_for(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == TIMEOUT_HEADER:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    return min(requested, self.__max_timeout)
+                break
+        return self.__default_timeout
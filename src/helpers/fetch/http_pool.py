@@ -0,0 +1,73 @@
+import httpx
+
+from urllib.parse import urlsplit
+
+from src.helpers.settings.settings import get_settings
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpPool:
+    """
+    Keeps one long-lived ``httpx.AsyncClient`` per upstream host so that
+    connections (and their TLS sessions) are reused across requests.
+    """
+    _clients: dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        settings = get_settings()
+        return httpx.Limits(
+            max_connections=settings.http_pool_size,
+            max_keepalive_connections=settings.http_pool_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        settings = get_settings()
+        return httpx.Timeout(
+            connect=settings.http_connect_timeout,
+            read=settings.http_read_timeout,
+            write=settings.http_read_timeout,
+            pool=settings.http_connect_timeout,
+        )
+
+    @classmethod
+    def client_for(cls, url: str) -> httpx.AsyncClient:
+        """
+        Returns the shared client for the host of the given URL, creating it on first use.
+
+        Args:
+            url (str): Any URL on the upstream host.
+        Returns:
+            httpx.AsyncClient: The pooled client for that host.
+        """
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+
+        client = cls._clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=cls._limits(),
+                timeout=cls._timeout(),
+                http2=_http2_available(),
+            )
+            cls._clients[host] = client
+        return client
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Closes every pooled client. Called when the application shuts down.
+        """
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        for client in clients:
+            await client.aclose()
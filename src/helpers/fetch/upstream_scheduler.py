@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+from src.helpers.settings.settings import get_settings
+
+INTERACTIVE = 0
+BATCH = 10
+
+# Priority of the upstream calls made for the current request; lower runs first.
+request_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    Raised when an upstream is throttling us or its circuit breaker is open.
+    """
+
+    def __init__(self, host: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"Upstream {host} is unavailable ({reason}), retry in {retry_after:.0f}s.")
+        self.host = host
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header given either in seconds or as an HTTP date.
+
+    Args:
+        value (str | None): The header value.
+    Returns:
+        float | None: The delay in seconds, or None if the header is absent or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = burst
+        self.__updated = time.monotonic()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def try_take(self) -> bool:
+        self.__refill()
+        if self.__tokens >= 1:
+            self.__tokens -= 1
+            return True
+        return False
+
+    def drain(self, seconds: float) -> None:
+        # Honour a Retry-After: no tokens until it has passed.
+        self.__refill()
+        self.__tokens = min(self.__tokens, -seconds * self.rate)
+
+    def wait_time(self) -> float:
+        self.__refill()
+        return max(0.0, (1 - self.__tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and fails fast for
+    ``reset_timeout`` seconds; then lets one trial call through (half-open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.__opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0:
+            self.state = self.HALF_OPEN
+            self.__trial_in_flight = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self.__trial_in_flight:
+            self.__trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.__failures = 0
+        self.__trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        # The caller went away mid-call; let another trial through.
+        self.__trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.__failures += 1
+        if self.state == self.HALF_OPEN or self.__failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.__opened_at = time.monotonic()
+            self.__trial_in_flight = False
+
+
+class UpstreamScheduler:
+    """
+    Admits calls to one upstream host.
+
+    Calls wait for a token from the host's token bucket in priority order
+    (interactive before batch), and are rejected up front while the host's
+    circuit breaker is open.
+    """
+    _schedulers: Dict[str, "UpstreamScheduler"] = {}
+
+    def __init__(self, host: str, rate: float, burst: float, max_retries: int, failure_threshold: int, reset_timeout: float) -> None:
+        self.host = host
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.__waiters: list = []
+        self.__sequence = itertools.count()
+        self.__dispatch_handle: asyncio.TimerHandle | None = None
+
+        self.retries = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.hedged = 0
+
+    @classmethod
+    def for_host(cls, host: str) -> "UpstreamScheduler":
+        """
+        Returns the scheduler of an upstream host, creating it from the environment on first use.
+
+        UPSTREAM_RATE_LIMITS can override the default rate per host, e.g. "api.themoviedb.org=40,archive-api.open-meteo.com=10".
+
+        Args:
+            host (str): The upstream host (netloc).
+        Returns:
+            UpstreamScheduler: The host's scheduler.
+        """
+        scheduler = cls._schedulers.get(host)
+        if scheduler is None:
+            settings = get_settings()
+            rate = settings.upstream_rate_limits.get(host, settings.upstream_rate)
+            scheduler = cls._schedulers[host] = cls(
+                host=host,
+                rate=rate,
+                # A bucket smaller than one token could never admit a call.
+                burst=max(1.0, settings.upstream_burst or rate),
+                max_retries=settings.upstream_max_retries,
+                failure_threshold=settings.upstream_breaker_threshold,
+                reset_timeout=settings.upstream_breaker_reset,
+            )
+        return scheduler
+
+    @classmethod
+    def all(cls) -> Dict[str, "UpstreamScheduler"]:
+        return cls._schedulers
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self.__waiters),
+            'breaker_open': int(self.breaker.state != CircuitBreaker.CLOSED),
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'throttled': self.throttled,
+            'hedged': self.hedged,
+        }
+
+    async def acquire(self) -> None:
+        """
+        Waits for permission to send one request.
+
+        Raises:
+            UpstreamUnavailableError: If the circuit breaker is open.
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailableError(self.host, "circuit open", self.breaker.retry_after())
+
+        if not self.__waiters and self.bucket.try_take():
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__waiters, (request_priority.get(), next(self.__sequence), future))
+        if self.__dispatch_handle is None:
+            self.__dispatch()
+        await future
+
+    def backoff(self, attempt: int, retry_after: float | None) -> float:
+        """
+        Returns how long to wait before retrying, honouring Retry-After when present.
+
+        Args:
+            attempt (int): The zero-based attempt that just failed.
+            retry_after (float | None): The upstream's Retry-After, in seconds.
+        Returns:
+            float: The delay in seconds.
+        """
+        self.retries += 1
+        if retry_after is not None:
+            self.throttled += 1
+            self.bucket.drain(retry_after)
+            return retry_after
+        return random.uniform(0, min(5.0, 0.2 * 2 ** attempt))
+
+    def __dispatch(self) -> None:
+        self.__dispatch_handle = None
+
+        while self.__waiters:
+            if self.__waiters[0][2].done():
+                # The caller gave up (cancelled); drop it without spending a token.
+                heapq.heappop(self.__waiters)
+                continue
+            if not self.bucket.try_take():
+                break
+            heapq.heappop(self.__waiters)[2].set_result(None)
+
+        if self.__waiters and self.__dispatch_handle is None:
+            self.__dispatch_handle = asyncio.get_running_loop().call_later(self.bucket.wait_time(), self.__dispatch)
@@ -0,0 +1,160 @@
+import asyncio
+import re
+import time
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Set
+
+LANGUAGE_PATTERN = re.compile(r"^[a-z]{2,3}(-[A-Z]{2})?$")
+
+
+def normalize_language(language: str) -> str:
+    """
+    Normalizes a language code to the ISO 639-1 / ISO 3166-1 form TMDB uses, e.g. ' en_us' -> 'en-US'.
+
+    Args:
+        language (str): The language code sent by the client.
+    Returns:
+        str: The normalized code.
+    Raises:
+        ValueError: If the code is not of the form 'xx' or 'xx-YY'.
+    """
+    code, _, region = language.strip().replace("_", "-").partition("-")
+    normalized = f"{code.lower()}-{region.upper()}" if region else code.lower()
+    if not LANGUAGE_PATTERN.match(normalized):
+        raise ValueError(f"Invalid language code '{language}'.")
+    return normalized
+
+
+class GenreCatalog:
+    """
+    In-process id -> name genre catalog, keyed by language.
+
+    Languages are loaded once (at startup or on first use) and refreshed in the
+    background every ``ttl`` seconds, so mapping genre ids never does network I/O.
+    Language codes are normalized, and at most ``max_languages`` are kept: past
+    that, the least recently used language that was not preloaded is dropped.
+    """
+
+    def __init__(self, fetch_genres: Callable[[str], Awaitable[List[dict]]], ttl: float = 86400.0, max_languages: int = 32) -> None:
+        self.__fetch_genres = fetch_genres
+        self.__ttl = ttl
+        self.__max_languages = max_languages
+        # Least recently used first.
+        self.__genres: OrderedDict[str, Dict[int, str]] = OrderedDict()
+        self.__loaded_at: Dict[str, float] = {}
+        self.__locks: Dict[str, asyncio.Lock] = {}
+        self.__preloaded: Set[str] = set()
+        self.__refresh_task: asyncio.Task | None = None
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self.__genres)
+
+    async def load(self, language: str) -> None:
+        """
+        Downloads the genre list for a language and swaps it into the catalog.
+
+        Args:
+            language (str): The language of the genre names (e.g., 'en-US').
+        Raises:
+            ValueError: If the language code is invalid.
+        """
+        language = normalize_language(language)
+        genres = await self.__fetch_genres(language)
+        self.__genres[language] = {genre['id']: genre['name'] for genre in genres}
+        self.__genres.move_to_end(language)
+        self.__loaded_at[language] = time.monotonic()
+        self.__evict()
+
+    async def ensure(self, language: str) -> None:
+        """
+        Loads a language the first time it is requested. Concurrent callers share a single load.
+
+        Args:
+            language (str): The language of the genre names.
+        Raises:
+            ValueError: If the language code is invalid.
+        """
+        language = normalize_language(language)
+        if language in self.__genres:
+            return
+
+        lock = self.__locks.setdefault(language, asyncio.Lock())
+        async with lock:
+            if language not in self.__genres:
+                await self.load(language)
+
+    def names_for(self, genre_ids: Iterable[int], language: str) -> List[str]:
+        """
+        Maps a batch of genre ids to their names without any network I/O.
+
+        Args:
+            genre_ids (Iterable[int]): The genre ids to map.
+            language (str): The language of the genre names.
+        Returns:
+            List[str]: The genre names. Unknown ids (or an unloaded or invalid language) are ignored.
+        """
+        try:
+            language = normalize_language(language)
+        except ValueError:
+            return []
+
+        genres = self.__genres.get(language)
+        if genres is None:
+            return []
+
+        self.__genres.move_to_end(language)
+        return [genres[genre_id] for genre_id in genre_ids if genre_id in genres]
+
+    async def start(self, languages: Iterable[str]) -> None:
+        """
+        Preloads the given languages and starts the background refresh loop.
+
+        Args:
+            languages (Iterable[str]): The languages to load up front.
+        """
+        for language in languages:
+            try:
+                self.__preloaded.add(normalize_language(language))
+                await self.ensure(language)
+            except Exception as e:
+                print(f"Error: Unable to preload genres for '{language}': {e}")
+
+        if self.__refresh_task is None:
+            self.__refresh_task = asyncio.create_task(self.__refresh_loop())
+
+    async def stop(self) -> None:
+        if self.__refresh_task is not None:
+            self.__refresh_task.cancel()
+            try:
+                await self.__refresh_task
+            except asyncio.CancelledError:
+                pass
+            self.__refresh_task = None
+
+    def __evict(self) -> None:
+        for language in list(self.__genres):
+            if len(self.__genres) <= self.__max_languages:
+                return
+            if language not in self.__preloaded:
+                del self.__genres[language]
+                self.__loaded_at.pop(language, None)
+                self.__locks.pop(language, None)
+
+    async def __refresh_loop(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = [language for language, loaded_at in self.__loaded_at.items() if now - loaded_at >= self.__ttl]
+
+            for language in due:
+                try:
+                    await self.load(language)
+                except Exception as e:
+                    # Keep serving the previous catalog and retry shortly.
+                    if language in self.__genres:
+                        self.__loaded_at[language] = now - self.__ttl + min(60.0, self.__ttl)
+                    print(f"Error: Unable to refresh genres for '{language}': {e}")
+
+            oldest = min(self.__loaded_at.values(), default=time.monotonic())
+            await asyncio.sleep(max(1.0, self.__ttl - (time.monotonic() - oldest)))
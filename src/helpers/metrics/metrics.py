@@ -0,0 +1,251 @@
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.__values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.__values[labels] = self.__values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.__values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus format.
+
+    Observing is a bisect and two additions, cheap enough for every upstream call.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.__series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.__series.get(labels)
+        if series is None:
+            # Bucket counts (the last one is +Inf), then sum and count.
+            series = self.__series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def percentile(self, percentile: float, *labels: str) -> float | None:
+        """
+        Estimates a percentile from the buckets (upper bound of the bucket it falls in).
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+            labels (str): The label values of the series.
+        Returns:
+            float | None: The estimate, or None if nothing was observed yet.
+        """
+        series = self.__series.get(labels)
+        if series is None or series[2] == 0:
+            return None
+
+        target = series[2] * percentile / 100
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[0]):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self.__series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauges:
+    """
+    A family of gauges read from a callback at scrape time, e.g. cache or queue stats.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str], collect: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.__collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.__collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.__metrics: Dict[str, Counter | Histogram | Gauges] = {}
+
+    def register(self, metric: Counter | Histogram | Gauges) -> Counter | Histogram | Gauges:
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Renders every registered metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines: List[str] = []
+        for metric in self.__metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+upstream_request_seconds = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Upstream HTTP call latency.", ("host", "route", "status"),
+))
+upstream_response_bytes = registry.register(Histogram(
+    "upstream_response_bytes", "Upstream HTTP response body size.", ("host", "route"), buckets=BYTES_BUCKETS,
+))
+service_step_seconds = registry.register(Histogram(
+    "service_step_duration_seconds", "Duration of MovieService pipeline steps.", ("operation", "step"),
+))
+http_request_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "API request latency, including serialization.", ("route", "method", "status"),
+))
+admission_wait_seconds = registry.register(Histogram(
+    "admission_wait_duration_seconds", "Time requests waited for an admission slot, admitted or shed.", ("route",),
+))
+admission_shed = registry.register(Counter(
+    "admission_shed_total", "Requests shed by admission control instead of queued.", ("route", "reason"),
+))
+
+
+# How long each startup phase took, in seconds, in the order they ran.
+startup_phases: Dict[str, float] = {}
+
+
+@contextmanager
+def startup_phase(name: str):
+    """
+    Times a startup phase into ``startup_phases``.
+
+    Args:
+        name (str): The phase name, e.g. "imports" or "prewarm".
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_phases[name] = time.perf_counter() - started
+
+
+def startup_report() -> str:
+    phases = ", ".join(f"{name} {duration * 1000:.1f}ms" for name, duration in startup_phases.items())
+    return f"Startup: {phases} (total {sum(startup_phases.values()) * 1000:.1f}ms)"
+
+
+# Timings collected while serving the current request, reported in the Server-Timing header.
+request_timings: ContextVar[List[Tuple[str, float, str]] | None] = ContextVar("request_timings", default=None)
+
+
+def record_timing(name: str, duration: float, description: str = "") -> None:
+    """
+    Adds an entry to the current request's Server-Timing header, if a request is being served.
+
+    Args:
+        name (str): The Server-Timing metric name (a token, no spaces).
+        duration (float): The duration in seconds.
+        description (str): Optional human readable description.
+    """
+    timings = request_timings.get()
+    if timings is not None:
+        timings.append((name, duration, description))
+
+
+def server_timing_header(timings: List[Tuple[str, float, str]]) -> str:
+    entries = []
+    for name, duration, description in timings:
+        entry = f"{name};dur={duration * 1000:.2f}"
+        if description:
+            entry += f';desc="{_escape(description)}"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every request, feeds ``http_request_seconds`` and
+    adds a ``Server-Timing`` header built from the request's recorded timings.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: List[Tuple[str, float, str]] = []
+        token = request_timings.set(timings)
+        status = [500]
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                total = time.perf_counter() - started
+                header = server_timing_header(timings + [("total", total, "")])
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                str(status[0]),
+            )
@@ -0,0 +1,218 @@
+import os
+import typing
+
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+
+
+class SettingsError(ValueError):
+    """
+    Raised at startup when the environment is missing required variables or has invalid values.
+    """
+
+    def __init__(self, problems: list) -> None:
+        super().__init__("Invalid configuration:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+def _setting(default=None, minimum: float | None = None, default_factory=None):
+    metadata = {"minimum": minimum}
+    if default_factory is not None:
+        return field(default_factory=default_factory, metadata=metadata)
+    return field(default=default, metadata=metadata)
+
+
+_REQUIRED = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Every setting of the application, read from the environment (and ``.env``)
+    once at startup. Each field is read from the upper-cased variable of the
+    same name, e.g. ``tmdb_url`` from ``TMDB_URL``.
+    """
+
+    tmdb_url: str = _setting(_REQUIRED)
+    tmdb_api_key: str = _setting(_REQUIRED)
+    weather_url: str = _setting(_REQUIRED)
+    host: str = _setting(_REQUIRED)
+    port: int = _setting(_REQUIRED, minimum=1)
+    webhook_url: Optional[str] = _setting(None)
+
+    http_pool_size: int = _setting(100, minimum=1)
+    http_pool_keepalive: int = _setting(20, minimum=0)
+    http_keepalive_expiry: float = _setting(30.0, minimum=0)
+    http_connect_timeout: float = _setting(3.0, minimum=0)
+    http_read_timeout: float = _setting(10.0, minimum=0)
+
+    upstream_rate: float = _setting(40.0, minimum=0.001)
+    upstream_burst: Optional[float] = _setting(None, minimum=1)
+    upstream_rate_limits: Dict[str, float] = _setting(default_factory=dict)
+    upstream_max_retries: int = _setting(2, minimum=0)
+    upstream_max_retry_wait: float = _setting(2.0, minimum=0)
+    upstream_breaker_threshold: int = _setting(5, minimum=1)
+    upstream_breaker_reset: float = _setting(30.0, minimum=0)
+
+    genre_catalog_languages: Tuple[str, ...] = _setting(("en-US",))
+    genre_catalog_ttl: float = _setting(86400.0, minimum=1)
+    genre_catalog_max_languages: int = _setting(32, minimum=1)
+
+    search_cache_ttl: float = _setting(3600.0, minimum=0)
+    search_cache_negative_ttl: float = _setting(300.0, minimum=0)
+    search_cache_stale_ttl: float = _setting(86400.0, minimum=0)
+    search_cache_max_entries: int = _setting(5000, minimum=1)
+    search_cache_max_bytes: int = _setting(33554432, minimum=1)
+
+    title_index_path: Optional[str] = _setting(None)
+    title_index_check_interval: float = _setting(60.0, minimum=0)
+    movie_cache_ttl: float = _setting(86400.0, minimum=0)
+    movie_cache_max_entries: int = _setting(20000, minimum=1)
+    movie_cache_max_bytes: int = _setting(67108864, minimum=1)
+    enrichment_cache_max_entries: int = _setting(20000, minimum=1)
+    enrichment_cache_max_bytes: int = _setting(134217728, minimum=1)
+
+    suggest_max_titles: int = _setting(50000, minimum=1)
+    suggest_cache_ttl: float = _setting(30.0, minimum=0)
+    suggest_cache_max_entries: int = _setting(10000, minimum=1)
+    suggest_max_limit: int = _setting(20, minimum=1)
+    suggest_max_age: int = _setting(60, minimum=0)
+
+    weather_grid_degrees: float = _setting(0.1, minimum=0.0001)
+    weather_recent_days: int = _setting(7, minimum=0)
+    weather_cache_recent_ttl: float = _setting(3600.0, minimum=0)
+    weather_cache_max_entries: int = _setting(200000, minimum=1)
+    weather_coalesce_window: float = _setting(0.005, minimum=0)
+    weather_max_range_days: int = _setting(366, minimum=1)
+    weather_archive_lag_days: int = _setting(5, minimum=0)
+
+    shared_cache_path: Optional[str] = _setting(None)
+    shared_cache_max_bytes: int = _setting(268435456, minimum=1)
+
+    webhook_queue_size: int = _setting(10000, minimum=1)
+    webhook_batch_size: int = _setting(1, minimum=1)
+    webhook_concurrency: int = _setting(8, minimum=1)
+    webhook_batch_interval: float = _setting(1.0, minimum=0)
+    webhook_max_retries: int = _setting(5, minimum=0)
+    webhook_retry_base_delay: float = _setting(0.5, minimum=0)
+    webhook_retry_max_delay: float = _setting(30.0, minimum=0)
+    webhook_shutdown_timeout: float = _setting(10.0, minimum=0)
+
+    request_timeout: float = _setting(10.0, minimum=0.001)
+    request_max_timeout: float = _setting(60.0, minimum=0.001)
+    hedge_percentile: Optional[float] = _setting(None, minimum=1)
+    hedge_min_delay: float = _setting(0.05, minimum=0)
+
+    admission_max_concurrency: int = _setting(64, minimum=1)
+    admission_route_limits: Dict[str, float] = _setting(default_factory=dict)
+    admission_max_queue: int = _setting(128, minimum=0)
+    admission_max_queue_wait: float = _setting(0.5, minimum=0)
+
+    batch_concurrency: int = _setting(16, minimum=1)
+    batch_max_items: int = _setting(500, minimum=1)
+    batch_max_concurrency: int = _setting(64, minimum=1)
+
+    gzip_minimum_size: int = _setting(1024, minimum=0)
+    gzip_level: int = _setting(6, minimum=1)
+    template_auto_reload: bool = _setting(False)
+
+    startup_prewarm: bool = _setting(False)
+    startup_prewarm_timeout: float = _setting(5.0, minimum=0)
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str]) -> "Settings":
+        """
+        Parses and validates the settings.
+
+        Args:
+            environ (Mapping[str, str]): The environment variables.
+        Returns:
+            Settings: The parsed settings.
+
+        Raises:
+            SettingsError: Listing every missing or invalid variable.
+        """
+        hints = typing.get_type_hints(cls)
+        values = {}
+        problems = []
+
+        for setting in fields(cls):
+            name = setting.name.upper()
+            raw = environ.get(name)
+
+            if raw is None or raw.strip() == "":
+                if setting.default is _REQUIRED:
+                    problems.append(f"{name} is required.")
+                continue
+
+            try:
+                value = cls.__parse(hints[setting.name], raw.strip())
+            except ValueError:
+                problems.append(f"{name}={raw!r} is not a valid {cls.__describe(hints[setting.name])}.")
+                continue
+
+            minimum = setting.metadata.get("minimum")
+            if minimum is not None and value is not None and value < minimum:
+                problems.append(f"{name}={raw!r} must be at least {minimum}.")
+                continue
+
+            values[setting.name] = value
+
+        for name in ("tmdb_url", "weather_url", "webhook_url"):
+            url = values.get(name)
+            if url is not None and not url.startswith(("http://", "https://")):
+                problems.append(f"{name.upper()}={url!r} must be an http(s) URL.")
+
+        percentile = values.get("hedge_percentile")
+        if percentile is not None and percentile >= 100:
+            problems.append(f"HEDGE_PERCENTILE={percentile!r} must be below 100.")
+
+        if problems:
+            raise SettingsError(problems)
+
+        return cls(**values)
+
+    @staticmethod
+    def __parse(hint, raw: str):
+        if hint is bool:
+            if raw.lower() in ("1", "true", "yes", "on"):
+                return True
+            if raw.lower() in ("0", "false", "no", "off"):
+                return False
+            raise ValueError(raw)
+        if hint in (int, float, str):
+            return hint(raw)
+        if hint == Tuple[str, ...]:
+            return tuple(item.strip() for item in raw.split(",") if item.strip())
+        if hint == Dict[str, float]:
+            return {key.strip(): float(value) for key, _, value in (item.partition("=") for item in raw.split(",") if item.strip())}
+        # Optional[X]
+        return Settings.__parse(typing.get_args(hint)[0], raw)
+
+    @staticmethod
+    def __describe(hint) -> str:
+        if typing.get_origin(hint) is typing.Union:
+            hint = typing.get_args(hint)[0]
+        if hint == Tuple[str, ...]:
+            return "comma-separated list"
+        if hint == Dict[str, float]:
+            return "comma-separated list of key=number"
+        return hint.__name__
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Loads ``.env`` once and returns the validated settings.
+
+    Returns:
+        Settings: The application settings.
+
+    Raises:
+        SettingsError: If a required variable is missing or a value is invalid.
+    """
+    load_dotenv()
+    return Settings.from_env(os.environ)
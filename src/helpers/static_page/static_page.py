@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import os
+
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class StaticPage:
+    """
+    A rendered page kept in memory, precompressed, with a strong ETag per encoding.
+
+    The page is rendered once, up front or with ``lazy`` on first use; with
+    ``watch`` set it is re-rendered when that file's modification time changes
+    (meant for development).
+    """
+
+    def __init__(self, render: Callable[[], str], media_type: str = "text/html; charset=utf-8", watch: str | None = None, max_age: int = 0, lazy: bool = False) -> None:
+        self.__render = render
+        self.__media_type = media_type
+        self.__watch = watch
+        self.__cache_control = f"public, max-age={max_age}, must-revalidate" if max_age else "no-cache"
+        self.__mtime: float | None = None
+        # encoding -> (body, etag); "identity" is the uncompressed page.
+        self.__variants: Dict[str, Tuple[bytes, str]] = {}
+        if not lazy:
+            self.render()
+
+    def render(self) -> None:
+        """
+        Renders the page and rebuilds its compressed variants.
+        """
+        if self.__watch is not None:
+            self.__mtime = os.stat(self.__watch).st_mtime
+
+        try:
+            import brotli
+        except ImportError:  # brotli is optional; gzip is always available.
+            brotli = None
+
+        body = self.__render().encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        variants = {"identity": (body, f'"{digest}"')}
+        variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+        if brotli is not None:
+            variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+        self.__variants = variants
+
+    def __reload_if_changed(self) -> None:
+        if self.__watch is None:
+            return
+        try:
+            if os.stat(self.__watch).st_mtime != self.__mtime:
+                self.render()
+        except OSError as e:
+            print(f"Error: Could not re-render {self.__watch}: {e}")
+
+    def __choose_encoding(self, accept_encoding: str) -> str:
+        accepted: List[str] = []
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            name, _, quality = params.strip().partition("=")
+            try:
+                if name.strip() == "q" and float(quality) == 0:
+                    continue
+            except ValueError:
+                pass
+            accepted.append(coding.strip().lower())
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.__variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        """
+        Builds the response for a request, honouring Accept-Encoding and If-None-Match.
+
+        Args:
+            request (Request): The incoming request.
+        Returns:
+            Response: The page, or an empty 304 if the client's copy is current.
+        """
+        if not self.__variants:
+            self.render()
+        self.__reload_if_changed()
+
+        encoding = self.__choose_encoding(request.headers.get("accept-encoding", ""))
+        body, etag = self.__variants[encoding]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": self.__cache_control}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if "*" in tags or etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=self.__media_type, headers=headers)
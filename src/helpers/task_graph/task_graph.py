@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Tuple
+
+
+class TaskGraph:
+    """
+    Runs a small dependency graph of coroutines.
+
+    Every step starts as soon as the steps it depends on have finished, so
+    independent steps run concurrently and the total latency tends towards the
+    critical path. A step receives its dependencies' results as keyword
+    arguments. The first failure cancels the remaining steps and is re-raised.
+    """
+
+    def __init__(self) -> None:
+        self.__steps: Dict[str, tuple[Callable[..., Awaitable[Any]], tuple[str, ...]]] = {}
+        self.__timings: Dict[str, dict] = {}
+
+    @property
+    def timings(self) -> Dict[str, dict]:
+        """
+        Per-step timings of the last run, in milliseconds relative to the start of the run.
+        """
+        return self.__timings
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], depends_on: Iterable[str] = ()) -> "TaskGraph":
+        """
+        Adds a step to the graph.
+
+        Args:
+            name (str): The step name, also used as the keyword under which dependents receive its result.
+            fn (Callable[..., Awaitable[Any]]): Coroutine function called with the dependency results.
+            depends_on (Iterable[str]): Names of steps that must finish first. They must already be added.
+        Returns:
+            TaskGraph: The graph, so calls can be chained.
+        Raises:
+            ValueError: If the step already exists or depends on an unknown step.
+        """
+        depends_on = tuple(depends_on)
+
+        if name in self.__steps:
+            raise ValueError(f"Step '{name}' is already defined.")
+        for dependency in depends_on:
+            if dependency not in self.__steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dependency}'.")
+
+        self.__steps[name] = (fn, depends_on)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs every step, each as soon as its inputs are ready.
+
+        Returns:
+            Dict[str, Any]: The result of every step by name.
+        """
+        results = {}
+        async for name, result in self.stream():
+            results[name] = result
+
+        return {name: results[name] for name in self.__steps}
+
+    async def stream(self) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Runs every step like ``run``, yielding each result as soon as its step finishes.
+
+        Closing the iterator early cancels the steps that are still running.
+
+        Yields:
+            Tuple[str, Any]: The step name and its result, in completion order.
+        """
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        self.__timings = {}
+
+        async def run_step(name: str) -> Any:
+            fn, depends_on = self.__steps[name]
+            inputs = {dependency: await tasks[dependency] for dependency in depends_on}
+
+            step_started = time.perf_counter()
+            try:
+                return await fn(**inputs)
+            finally:
+                finished = time.perf_counter()
+                self.__timings[name] = {
+                    'start_ms': round((step_started - started) * 1000, 2),
+                    'duration_ms': round((finished - step_started) * 1000, 2),
+                }
+
+        # Steps are added after their dependencies, so creating the tasks in order is safe.
+        for name in self.__steps:
+            tasks[name] = asyncio.create_task(run_step(name))
+
+        names = {task: name for name, task in tasks.items()}
+        order = {name: position for position, name in enumerate(self.__steps)}
+        pending = set(tasks.values())
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                done = sorted(done, key=lambda task: order[names[task]])
+
+                errors = [task.exception() for task in done if task.exception() is not None]
+                if errors:
+                    raise errors[0]
+
+                if not pending:
+                    self.__timings['total'] = {
+                        'start_ms': 0.0,
+                        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                    }
+
+                for task in done:
+                    yield names[task], task.result()
+        finally:
+            for task in tasks.values():
+                task.cancel()
@@ -0,0 +1,230 @@
+import bisect
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import time
+import unicodedata
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+MAGIC = b"TIDX"
+VERSION = 1
+
+# magic, version, records, keys, postings, title bytes, prefix length; padded to 32 bytes.
+HEADER = struct.Struct("<4sIIIIII4x")
+
+# The two top bits of a key hash say what kind of key it is, so the builder can
+# keep a different number of postings per kind.
+EXACT = 0
+PREFIX = 1
+TRIGRAM = 2
+_HASH_MASK = (1 << 62) - 1
+
+
+def normalize(title: str) -> str:
+    """
+    Normalizes a title for indexing and lookups: case-folded, without accents or
+    punctuation, with collapsed whitespace.
+
+    Args:
+        title (str): The title.
+    Returns:
+        str: The normalized title.
+    """
+    decomposed = unicodedata.normalize("NFKD", title.casefold())
+    chars = [char if char.isalnum() else " " for char in decomposed if not unicodedata.combining(char)]
+    return " ".join("".join(chars).split())
+
+
+@functools.lru_cache(maxsize=65536)
+def key_hash(kind: int, text: str) -> int:
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return (kind << 62) | (int.from_bytes(digest, "little") & _HASH_MASK)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_keys(normalized: str, prefix_length: int) -> Set[int]:
+    """
+    Returns the key hashes a normalized title is indexed under: the full title,
+    its prefixes up to ``prefix_length`` characters and its trigrams.
+    """
+    keys = {key_hash(EXACT, normalized)}
+    keys.update(key_hash(PREFIX, normalized[:length]) for length in range(1, min(len(normalized), prefix_length) + 1))
+    keys.update(key_hash(TRIGRAM, trigram) for trigram in trigrams(normalized))
+    return keys
+
+
+def align_offset(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+@dataclass(slots=True)
+class IndexedTitle:
+    id: int
+    title: str
+    popularity: float
+
+
+class TitleIndex:
+    """
+    Read-only, memory-mapped title index built by ``TitleIndexBuilder``.
+
+    Opening it only maps the file and reads the header, so it loads in
+    milliseconds whatever its size. Layout (little-endian, 8-byte aligned
+    sections): header, sorted key hashes (u64), movie ids (u32), popularity
+    (f32), title offsets (u32), posting offsets per key (u32), postings
+    (u32 record numbers, most popular first) and the UTF-8 titles.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, records, keys, postings, title_bytes, prefix_length = HEADER.unpack_from(self.__mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.__mmap.close()
+            raise ValueError(f"{path} is not a title index (version {VERSION}).")
+
+        self.path = path
+        self.prefix_length = prefix_length
+        view = memoryview(self.__mmap)
+        offset = HEADER.size
+
+        def section(count: int, item_size: int, fmt: str) -> memoryview:
+            nonlocal offset
+            start = offset
+            offset = align_offset(offset + count * item_size)
+            return view[start:start + count * item_size].cast(fmt)
+
+        self.__keys = section(keys, 8, "Q")
+        self.__ids = section(records, 4, "I")
+        self.__popularity = section(records, 4, "f")
+        self.__title_offsets = section(records + 1, 4, "I")
+        self.__key_offsets = section(keys + 1, 4, "I")
+        self.__postings = section(postings, 4, "I")
+        self.__titles = view[offset:offset + title_bytes]
+
+    def __len__(self) -> int:
+        return len(self.__ids)
+
+    def __postings_for(self, key: int) -> memoryview:
+        position = bisect.bisect_left(self.__keys, key)
+        if position == len(self.__keys) or self.__keys[position] != key:
+            return self.__postings[0:0]
+        return self.__postings[self.__key_offsets[position]:self.__key_offsets[position + 1]]
+
+    def __title(self, record: int) -> str:
+        return bytes(self.__titles[self.__title_offsets[record]:self.__title_offsets[record + 1]]).decode("utf-8")
+
+    def __entry(self, record: int) -> IndexedTitle:
+        return IndexedTitle(id=self.__ids[record], title=self.__title(record), popularity=round(self.__popularity[record], 3))
+
+    def exact(self, title: str) -> List[IndexedTitle]:
+        """
+        Finds the titles that match exactly once normalized, most popular first.
+
+        Args:
+            title (str): The title to look up.
+        Returns:
+            List[IndexedTitle]: The matches, possibly empty.
+        """
+        normalized = normalize(title)
+        if not normalized:
+            return []
+
+        return [
+            self.__entry(record)
+            for record in self.__postings_for(key_hash(EXACT, normalized))
+            if normalize(self.__title(record)) == normalized
+        ]
+
+    def prefix(self, text: str, limit: int = 10) -> List[IndexedTitle]:
+        """
+        Finds the most popular titles starting with ``text``.
+
+        Prefixes up to the index's prefix length are answered from their own
+        postings; longer ones are filtered from the postings of their first
+        ``prefix_length`` characters and of their trigrams.
+
+        Args:
+            text (str): The prefix as typed.
+            limit (int): The maximum number of titles.
+        Returns:
+            List[IndexedTitle]: The matches, most popular first.
+        """
+        normalized = normalize(text)
+        if not normalized:
+            return []
+
+        if len(normalized) <= self.prefix_length:
+            return [self.__entry(record) for record in self.__postings_for(key_hash(PREFIX, normalized))[:limit]]
+
+        candidates = set(self.__postings_for(key_hash(PREFIX, normalized[:self.prefix_length])))
+        candidates.update(self.__candidates(trigrams(normalized)))
+        matches = [record for record in candidates if normalize(self.__title(record)).startswith(normalized)]
+        matches.sort(key=lambda record: (-self.__popularity[record], record))
+        return [self.__entry(record) for record in matches[:limit]]
+
+    def __candidates(self, wanted: Iterable[str]) -> Dict[int, int]:
+        shared: Dict[int, int] = {}
+        for trigram in wanted:
+            for record in self.__postings_for(key_hash(TRIGRAM, trigram)):
+                shared[record] = shared.get(record, 0) + 1
+        return shared
+
+
+class TitleIndexFile:
+    """
+    The title index at ``path``, opened on first use and reopened when the file
+    is replaced (the builder swaps it in with ``os.replace``).
+
+    The file is checked at most every ``check_interval`` seconds. Lookups that
+    are still using the previous index keep their mapping until they finish.
+    """
+
+    def __init__(self, path: str | None, check_interval: float = 60.0) -> None:
+        self.__path = path or None
+        self.__check_interval = check_interval
+        self.__index: TitleIndex | None = None
+        self.__identity: tuple | None = None
+        self.__checked_at = float("-inf")
+
+    def current(self) -> TitleIndex | None:
+        """
+        Returns the current index.
+
+        Returns:
+            TitleIndex | None: The index, or None if no path is configured or the file cannot be opened.
+        """
+        if self.__path is None:
+            return None
+
+        now = time.monotonic()
+        if now - self.__checked_at >= self.__check_interval:
+            self.__checked_at = now
+            self.__reload_if_replaced()
+
+        return self.__index
+
+    def __reload_if_replaced(self) -> None:
+        try:
+            stat = os.stat(self.__path)
+        except OSError:
+            return
+
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self.__identity:
+            return
+
+        try:
+            self.__index = TitleIndex(self.__path)
+            self.__identity = identity
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error: Unable to open the title index {self.__path}: {e}")
@@ -0,0 +1,207 @@
+import gzip
+import heapq
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from array import array
+from itertools import groupby
+from typing import BinaryIO, Iterator, List, Tuple
+
+import orjson
+
+from src.helpers.title_index.title_index import EXACT, HEADER, MAGIC, PREFIX, TRIGRAM, VERSION, align_offset, index_keys, normalize
+
+# A posting is packed into one integer that sorts by key, then by descending
+# popularity: key hash (64 bits) | inverted float32 popularity (32) | record (32).
+# Sorting plain integers is several times faster than sorting tuples.
+_ENTRY_BYTES = 16
+_READ_ENTRIES = 4096
+_FLOAT = struct.Struct("<f")
+_UINT = struct.Struct("<I")
+
+
+def _inverted_popularity(popularity: float) -> int:
+    # Bit patterns of non-negative floats sort like the floats themselves.
+    return 0xFFFFFFFF - _UINT.unpack(_FLOAT.pack(max(0.0, popularity)))[0]
+
+
+class TitleIndexBuilder:
+    """
+    Builds a ``TitleIndex`` from a TMDB daily ID export (``movie_ids_MM_DD_YYYY.json.gz``).
+
+    The export is streamed line by line. Postings are collected in chunks of
+    ``chunk_size`` entries, each chunk is sorted and spilled to a temporary run
+    file, and the runs are merged into the final file, keeping the ``top_k``
+    most popular titles per key (``trigram_top_k`` for trigram keys). Memory
+    therefore stays bounded by the chunk size plus 12 bytes per title.
+
+    The index is written next to ``output`` and moved into place with
+    ``os.replace``, so readers always see either the old or the new file.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 10,
+        trigram_top_k: int = 64,
+        prefix_length: int = 6,
+        chunk_size: int = 500000,
+        min_popularity: float = 0.0,
+        include_adult: bool = False,
+    ) -> None:
+        self.__limits = {EXACT: top_k, PREFIX: top_k, TRIGRAM: trigram_top_k}
+        self.__prefix_length = prefix_length
+        self.__chunk_size = chunk_size
+        self.__min_popularity = min_popularity
+        self.__include_adult = include_adult
+
+        self.lines = 0
+        self.skipped = 0
+        self.records = 0
+        self.keys = 0
+        self.postings = 0
+
+    def build(self, source: str, output: str, progress_every: int = 0) -> None:
+        """
+        Builds the index and atomically replaces ``output`` with it.
+
+        Args:
+            source (str): The export file, gzip-compressed or plain JSON lines.
+            output (str): The index file to write.
+            progress_every (int): Print progress every this many lines (0 disables it).
+        """
+        directory = os.path.dirname(os.path.abspath(output))
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=directory, prefix=".title_index_") as workdir:
+            ids = array("I")
+            popularity = array("f")
+            title_offsets = array("I", [0])
+            runs: List[str] = []
+            chunk: List[int] = []
+            started = time.monotonic()
+
+            with open(os.path.join(workdir, "titles"), "wb") as titles:
+                for movie in self.__read(source):
+                    if progress_every and self.lines % progress_every == 0:
+                        print(f"{self.lines} lines, {len(ids)} titles, {time.monotonic() - started:.0f}s")
+
+                    title = movie.get("original_title") or ""
+                    normalized = normalize(title)
+                    score = float(movie.get("popularity") or 0.0)
+                    if not normalized or score < self.__min_popularity or (movie.get("adult") and not self.__include_adult):
+                        self.skipped += 1
+                        continue
+
+                    record = len(ids)
+                    ids.append(int(movie["id"]))
+                    popularity.append(score)
+                    encoded = title.encode("utf-8")
+                    titles.write(encoded)
+                    title_offsets.append(title_offsets[-1] + len(encoded))
+
+                    suffix = (_inverted_popularity(score) << 32) | record
+                    chunk.extend((key << 64) | suffix for key in index_keys(normalized, self.__prefix_length))
+                    if len(chunk) >= self.__chunk_size:
+                        runs.append(self.__spill(chunk, workdir, len(runs)))
+                        chunk = []
+
+            if chunk:
+                runs.append(self.__spill(chunk, workdir, len(runs)))
+            self.records = len(ids)
+
+            keys_path, key_offsets_path, postings_path = self.__merge(runs, workdir)
+            self.__write(output, workdir, ids, popularity, title_offsets, keys_path, key_offsets_path, postings_path)
+
+    def __read(self, source: str) -> Iterator[dict]:
+        opener = gzip.open if source.endswith(".gz") else open
+        with opener(source, "rb") as lines:
+            for line in lines:
+                self.lines += 1
+                try:
+                    movie = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    self.skipped += 1
+                    continue
+                if isinstance(movie, dict) and "id" in movie:
+                    yield movie
+                else:
+                    self.skipped += 1
+
+    def __spill(self, chunk: List[int], workdir: str, number: int) -> str:
+        chunk.sort()
+        path = os.path.join(workdir, f"run-{number}")
+        with open(path, "wb") as run:
+            # A chunk never needs more than the top postings of each key either.
+            for key, entries in groupby(chunk, key=lambda entry: entry >> 64):
+                kept = list(entries)[:self.__limits[key >> 62]]
+                run.write(b"".join(entry.to_bytes(_ENTRY_BYTES, "big") for entry in kept))
+        return path
+
+    @staticmethod
+    def __read_run(path: str) -> Iterator[int]:
+        with open(path, "rb") as run:
+            while block := run.read(_ENTRY_BYTES * _READ_ENTRIES):
+                for start in range(0, len(block), _ENTRY_BYTES):
+                    yield int.from_bytes(block[start:start + _ENTRY_BYTES], "big")
+
+    def __merge(self, runs: List[str], workdir: str) -> Tuple[str, str, str]:
+        paths = tuple(os.path.join(workdir, name) for name in ("keys", "key_offsets", "postings"))
+
+        with open(paths[0], "wb") as keys, open(paths[1], "wb") as key_offsets, open(paths[2], "wb") as postings:
+            key_buffer, offset_buffer, posting_buffer = array("Q"), array("I", [0]), array("I")
+
+            for key, entries in groupby(heapq.merge(*(self.__read_run(path) for path in runs)), key=lambda entry: entry >> 64):
+                limit = self.__limits[key >> 62]
+                kept = 0
+                for entry in entries:
+                    if kept == limit:
+                        continue
+                    posting_buffer.append(entry & 0xFFFFFFFF)
+                    kept += 1
+
+                self.keys += 1
+                self.postings += kept
+                key_buffer.append(key)
+                offset_buffer.append(self.postings)
+
+                if len(key_buffer) >= _READ_ENTRIES * 16:
+                    self.__flush(keys, key_buffer)
+                    self.__flush(key_offsets, offset_buffer)
+                    self.__flush(postings, posting_buffer)
+
+            self.__flush(keys, key_buffer)
+            self.__flush(key_offsets, offset_buffer)
+            self.__flush(postings, posting_buffer)
+
+        return paths
+
+    @staticmethod
+    def __flush(file: BinaryIO, buffer: array) -> None:
+        buffer.tofile(file)
+        del buffer[:]
+
+    def __write(self, output: str, workdir: str, ids: array, popularity: array, title_offsets: array, keys_path: str, key_offsets_path: str, postings_path: str) -> None:
+        titles_path = os.path.join(workdir, "titles")
+        temporary = os.path.join(workdir, "index")
+
+        with open(temporary, "wb") as index:
+            index.write(HEADER.pack(MAGIC, VERSION, len(ids), self.keys, self.postings, title_offsets[-1], self.__prefix_length))
+
+            def pad() -> None:
+                index.write(b"\0" * (align_offset(index.tell()) - index.tell()))
+
+            for section in (keys_path, ids, popularity, title_offsets, key_offsets_path, postings_path, titles_path):
+                if isinstance(section, array):
+                    section.tofile(index)
+                else:
+                    with open(section, "rb") as part:
+                        shutil.copyfileobj(part, index)
+                pad()
+
+            index.flush()
+            os.fsync(index.fileno())
+
+        os.replace(temporary, output)
@@ -0,0 +1,111 @@
+import bisect
+import heapq
+
+from typing import Dict, List, Tuple
+
+from src.helpers.title_index.title_index import IndexedTitle, normalize
+
+
+class Typeahead:
+    """
+    In-memory prefix map of the titles users actually looked up.
+
+    Every prefix of a normalized title (up to ``prefix_length`` characters) maps
+    to all of its titles, most popular first, so a suggestion is one dict lookup
+    and the ``top_n`` first entries. The lists are kept whole so that removing
+    or re-ranking a title lets the next one move up. At most ``max_titles``
+    titles are kept; the least popular one makes room for a new one.
+    """
+
+    def __init__(self, max_titles: int = 50000, top_n: int = 20, prefix_length: int = 20) -> None:
+        self.__max_titles = max_titles
+        self.__top_n = top_n
+        self.__prefix_length = prefix_length
+        # movie id -> (title, normalized title, popularity)
+        self.__titles: Dict[int, Tuple[str, str, float]] = {}
+        # prefix -> [(-popularity, movie id)], most popular first
+        self.__prefixes: Dict[str, List[Tuple[float, int]]] = {}
+        # (popularity, movie id) of the kept titles; entries for replaced titles are skipped lazily.
+        self.__by_popularity: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.__titles)
+
+    def add(self, movie_id: int, title: str, popularity: float) -> None:
+        """
+        Adds a title, or updates its popularity.
+
+        Args:
+            movie_id (int): The TMDB movie id.
+            title (str): The title to suggest.
+            popularity (float): The TMDB popularity used for ranking.
+        """
+        normalized = normalize(title)
+        if not normalized:
+            return
+
+        known = self.__titles.get(movie_id)
+        if known is not None:
+            if known[1] == normalized and known[2] == popularity:
+                return
+            self.__remove(movie_id)
+
+        if len(self.__titles) >= self.__max_titles:
+            least_popular = self.__least_popular()
+            if least_popular is None or least_popular[0] >= popularity:
+                return
+            self.__remove(least_popular[1])
+
+        self.__titles[movie_id] = (title, normalized, popularity)
+        heapq.heappush(self.__by_popularity, (popularity, movie_id))
+        if len(self.__by_popularity) > 2 * len(self.__titles) + 64:
+            self.__by_popularity = [(known[2], known_id) for known_id, known in self.__titles.items()]
+            heapq.heapify(self.__by_popularity)
+
+        entry = (-popularity, movie_id)
+        for length in range(1, min(len(normalized), self.__prefix_length) + 1):
+            bisect.insort(self.__prefixes.setdefault(normalized[:length], []), entry)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[IndexedTitle]:
+        """
+        Returns the most popular known titles starting with ``prefix``.
+
+        Args:
+            prefix (str): The prefix as typed.
+            limit (int): The maximum number of titles.
+        Returns:
+            List[IndexedTitle]: The matches, most popular first.
+        """
+        normalized = normalize(prefix)
+        if not normalized:
+            return []
+
+        limit = min(limit, self.__top_n)
+        entries = self.__prefixes.get(normalized[:self.__prefix_length], [])
+        suggestions = []
+        for _, movie_id in entries:
+            title, title_normalized, popularity = self.__titles[movie_id]
+            if title_normalized.startswith(normalized):
+                suggestions.append(IndexedTitle(id=movie_id, title=title, popularity=popularity))
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+    def __least_popular(self) -> Tuple[float, int] | None:
+        while self.__by_popularity:
+            popularity, movie_id = self.__by_popularity[0]
+            known = self.__titles.get(movie_id)
+            if known is not None and known[2] == popularity:
+                return popularity, movie_id
+            heapq.heappop(self.__by_popularity)
+        return None
+
+    def __remove(self, movie_id: int) -> None:
+        _, normalized, popularity = self.__titles.pop(movie_id)
+        entry = (-popularity, movie_id)
+        for length in range(1, min(len(normalized), self.__prefix_length) + 1):
+            prefix = normalized[:length]
+            entries = self.__prefixes[prefix]
+            del entries[bisect.bisect_left(entries, entry)]
+            if not entries:
+                del self.__prefixes[prefix]
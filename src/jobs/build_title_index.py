@@ -0,0 +1,55 @@
+"""
+Builds the local title index from a TMDB daily ID export.
+
+Download the export (see https://developer.themoviedb.org/docs/daily-id-exports), then:
+
+    python -m src.jobs.build_title_index movie_ids_10_17_2026.json.gz --output data/title_index.bin
+
+The new index replaces the old one atomically; running apps pick it up within
+TITLE_INDEX_CHECK_INTERVAL seconds.
+"""
+import argparse
+import time
+
+from src.helpers.title_index.title_index import TitleIndex
+from src.helpers.title_index.title_index_builder import TitleIndexBuilder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the local title index from a TMDB daily ID export.")
+    parser.add_argument("source", help="The export file (movie_ids_MM_DD_YYYY.json.gz)")
+    parser.add_argument("--output", default="data/title_index.bin", help="The index file to write")
+    parser.add_argument("--top-k", type=int, default=10, help="Titles kept per exact title and prefix")
+    parser.add_argument("--trigram-top-k", type=int, default=64, help="Titles kept per trigram")
+    parser.add_argument("--prefix-length", type=int, default=6, help="Longest prefix with its own postings")
+    parser.add_argument("--chunk-size", type=int, default=500000, help="Postings sorted in memory before spilling to disk")
+    parser.add_argument("--min-popularity", type=float, default=0.0, help="Skip titles less popular than this")
+    parser.add_argument("--include-adult", action="store_true", help="Index adult titles too")
+    parser.add_argument("--progress-every", type=int, default=100000, help="Print progress every N lines (0 disables it)")
+    args = parser.parse_args()
+
+    builder = TitleIndexBuilder(
+        top_k=args.top_k,
+        trigram_top_k=args.trigram_top_k,
+        prefix_length=args.prefix_length,
+        chunk_size=args.chunk_size,
+        min_popularity=args.min_popularity,
+        include_adult=args.include_adult,
+    )
+
+    started = time.monotonic()
+    builder.build(args.source, args.output, progress_every=args.progress_every)
+    built = time.monotonic() - started
+
+    started = time.perf_counter()
+    index = TitleIndex(args.output)
+    opened = time.perf_counter() - started
+
+    print(
+        f"Indexed {builder.records} of {builder.lines} titles ({builder.skipped} skipped) into {args.output}: "
+        f"{builder.keys} keys, {builder.postings} postings, built in {built:.1f}s, opens in {opened * 1000:.2f}ms ({len(index)} titles)."
+    )
+
+
+if __name__ == "__main__":
+    main()
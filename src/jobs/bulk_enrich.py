@@ -0,0 +1,360 @@
+"""
+Enriches a catalog of movies offline with the same data as POST /api/v1/movies/get-movie-and-weather-data.
+
+    python -m src.jobs.bulk_enrich catalog.csv --output data/catalog.enriched.jsonl
+
+The input is CSV with a header row, or JSONL, optionally gzipped, with the columns
+movie_title, latitude, longitude and optionally language. It is read lazily, so
+catalogs of any size run in constant memory apart from the per-run deduplication.
+Rows go through MovieService with bounded concurrency, behind the same per-host
+rate limits as the API (UPSTREAM_RATE / UPSTREAM_RATE_LIMITS). No webhook events
+are sent.
+
+Every output line carries the number of its input row. Progress is checkpointed
+next to the output, so running the same command again after an interruption
+resumes where it stopped.
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import typing
+
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from src.helpers.fetch.deadline import DeadlineExceededError, deadline
+from src.helpers.fetch.http_pool import HttpPool
+from src.helpers.fetch.upstream_scheduler import BATCH, UpstreamUnavailableError, request_priority
+from src.helpers.settings.settings import get_settings
+from src.schemas.movie_include import MovieInclude
+from src.schemas.movie_response import MovieWithWeather
+from src.services.movie_service import MovieNotFoundError, MovieService
+from src.utils.tmdb_utils import genre_catalog, normalize_title
+from src.utils.weather_utils import snap_to_grid
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _is_csv(path: str) -> bool:
+    return path.removesuffix(".gz").endswith(".csv")
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Reads the input rows lazily.
+
+    Args:
+        path (str): A .csv or .jsonl file, optionally gzipped.
+    Yields:
+        Tuple[int, dict]: The row number (from 0, header and blank lines excluded) and the row.
+                          A JSONL line that is not valid JSON yields an empty row.
+    """
+    with _open_text(path) as source:
+        if _is_csv(path):
+            yield from enumerate(csv.DictReader(source))
+            return
+
+        lines = (line for line in source if line.strip())
+        for number, line in enumerate(lines):
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = {}
+            yield number, row if isinstance(row, dict) else {}
+
+
+def count_rows(path: str) -> int:
+    """
+    Counts the input lines for the ETA; blank lines and CSV fields spanning several lines make it approximate.
+
+    Args:
+        path (str): The input file.
+    Returns:
+        int: The number of rows.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    lines = 0
+    with opener(path, "rb") as source:
+        while chunk := source.read(1 << 20):
+            lines += chunk.count(b"\n")
+    return max(0, lines - 1) if _is_csv(path) else lines
+
+
+class Checkpoint:
+    """
+    Which input rows are already in the output file.
+
+    Rows finish out of order, so the checkpoint keeps the first row that is not
+    done yet, the rows after it that are, and how much of the output file they
+    cover. Lines written after the last save are recovered from the output itself.
+    """
+
+    def __init__(self, path: str, output: str) -> None:
+        self.__path = path
+        self.__output = output
+        self.next_row = 0
+        self.__done_after: set = set()
+
+    def load(self) -> None:
+        """
+        Restores the progress of an earlier run and drops a partly written last output line.
+
+        Raises:
+            ValueError: If the output file is shorter than the checkpoint says.
+        """
+        output_bytes = 0
+        if os.path.exists(self.__path):
+            with open(self.__path, "r", encoding="utf-8") as checkpoint:
+                state = json.load(checkpoint)
+            self.next_row = state["next_row"]
+            self.__done_after = set(state["done_after"])
+            output_bytes = state["output_bytes"]
+
+        if not os.path.exists(self.__output):
+            if output_bytes:
+                raise ValueError(f"{self.__output} is missing but {self.__path} expects {output_bytes} bytes; delete the checkpoint to start over.")
+            return
+
+        with open(self.__output, "r+b") as output:
+            output.seek(0, os.SEEK_END)
+            if output.tell() < output_bytes:
+                raise ValueError(f"{self.__output} is shorter than {self.__path} expects; delete both to start over.")
+
+            output.seek(output_bytes)
+            complete = output_bytes
+            for line in output:
+                if not line.endswith(b"\n"):
+                    break
+                complete += len(line)
+                self.mark_done(orjson.loads(line)["row"])
+            output.truncate(complete)
+
+    def is_done(self, row: int) -> bool:
+        return row < self.next_row or row in self.__done_after
+
+    def mark_done(self, row: int) -> None:
+        self.__done_after.add(row)
+        while self.next_row in self.__done_after:
+            self.__done_after.remove(self.next_row)
+            self.next_row += 1
+
+    def save(self, output_bytes: int) -> None:
+        """
+        Writes the checkpoint atomically.
+
+        Args:
+            output_bytes (int): The size of the output file, flushed, that the checkpoint covers.
+        """
+        temporary = f"{self.__path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as checkpoint:
+            json.dump({"next_row": self.next_row, "done_after": sorted(self.__done_after), "output_bytes": output_bytes}, checkpoint)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(temporary, self.__path)
+
+
+class BulkEnrichment:
+    """
+    Runs input rows through MovieService with a fixed number of workers.
+
+    Rows asking for the same title, language and weather grid cell share one
+    lookup. Upstream throttling and deadlines are retried a few times, honouring
+    Retry-After; any other failure is written to the output with its status.
+    """
+
+    def __init__(self, output: str, checkpoint: Checkpoint, concurrency: int, language: str, include: List[str], timeout: float, retries: int) -> None:
+        self.__output = output
+        self.__checkpoint = checkpoint
+        self.__concurrency = concurrency
+        self.__language = language
+        self.__include = include
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__shared: Dict[tuple, asyncio.Task] = {}
+
+        self.written = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.statuses: Counter = Counter()
+
+    async def run(self, rows: Iterator[Tuple[int, dict]], total: Optional[int], progress_interval: float) -> None:
+        """
+        Processes every row that is not in the output yet.
+
+        Args:
+            rows (Iterator[Tuple[int, dict]]): The numbered input rows.
+            total (Optional[int]): The number of input rows, for the ETA.
+            progress_interval (float): Seconds between progress lines (0 disables them).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.__concurrency * 2)
+        started = time.monotonic()
+
+        with open(self.__output, "ab") as output:
+            workers = [asyncio.create_task(self.__work(queue, output)) for _ in range(self.__concurrency)]
+            reporter = asyncio.create_task(self.__report(started, total, progress_interval, output))
+            try:
+                for row, data in rows:
+                    if self.__checkpoint.is_done(row):
+                        self.skipped += 1
+                        continue
+                    await queue.put((row, data))
+
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in (*workers, reporter):
+                    task.cancel()
+                output.flush()
+                self.__checkpoint.save(output.tell())
+
+        self.__print_progress(started, total)
+
+    async def __work(self, queue: asyncio.Queue, output) -> None:
+        while (item := await queue.get()) is not None:
+            row, data = item
+            line = {"row": row, **await self.__enrich_row(data)}
+            output.write(orjson.dumps(line) + b"\n")
+            self.__checkpoint.mark_done(row)
+            self.written += 1
+            self.statuses[line["status"]] += 1
+
+    async def __enrich_row(self, data: dict) -> dict:
+        try:
+            request = {
+                "movie_title": str(data.get("movie_title") or data.get("title") or "").strip(),
+                "language": str(data.get("language") or self.__language),
+                "latitude": float(data["latitude"]),
+                "longitude": float(data["longitude"]),
+            }
+            if not request["movie_title"]:
+                raise ValueError("movie_title is empty")
+        except (KeyError, TypeError, ValueError) as e:
+            return {"input": data, "status": 400, "detail": f"Invalid row: {e}"}
+
+        key = (normalize_title(request["movie_title"]), request["language"], snap_to_grid(request["latitude"], request["longitude"]))
+        lookup = self.__shared.get(key)
+        if lookup is None:
+            lookup = self.__shared[key] = asyncio.create_task(self.__lookup(request))
+        else:
+            self.duplicates += 1
+
+        return {"input": request, **await lookup}
+
+    async def __lookup(self, request: dict) -> dict:
+        for attempt in range(self.__retries + 1):
+            try:
+                with deadline(self.__timeout):
+                    movie, _ = await MovieService.get_movie_and_weather_data(
+                        title=request["movie_title"],
+                        language=request["language"],
+                        latitude=request["latitude"],
+                        longitude=request["longitude"],
+                        include=self.__include,
+                    )
+                result = {"status": 200, "response": MovieWithWeather.from_dict(movie)}
+                if "included" in movie:
+                    result["included"] = movie["included"]
+                return result
+            except MovieNotFoundError as e:
+                return {"status": 404, "detail": str(e)}
+            except UpstreamUnavailableError as e:
+                if attempt == self.__retries:
+                    return {"status": 503, "detail": str(e)}
+                await asyncio.sleep(max(1.0, e.retry_after))
+            except DeadlineExceededError as e:
+                if attempt == self.__retries:
+                    return {"status": 504, "detail": str(e)}
+            except Exception as e:
+                return {"status": 500, "detail": str(e)}
+
+    async def __report(self, started: float, total: Optional[int], interval: float, output) -> None:
+        if not interval:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            output.flush()
+            self.__checkpoint.save(output.tell())
+            self.__print_progress(started, total)
+
+    def __print_progress(self, started: float, total: Optional[int]) -> None:
+        elapsed = time.monotonic() - started
+        rate = self.written / elapsed if elapsed > 0 else 0.0
+        done = self.written + self.skipped
+
+        progress = f"{done}/{total}" if total else f"{done}"
+        eta = ""
+        if total and rate > 0:
+            remaining = max(0, total - done) / rate
+            eta = f", ETA {int(remaining // 3600)}:{int(remaining % 3600 // 60):02d}:{int(remaining % 60):02d}"
+
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(self.statuses.items()))
+        print(
+            f"{progress} rows ({self.skipped} already done), {rate:.1f} rows/s{eta}, "
+            f"{self.duplicates} duplicates, statuses {{{statuses}}}"
+        )
+
+
+async def enrich(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint", args.output)
+    checkpoint.load()
+
+    total = None if args.no_count else count_rows(args.input)
+    job = BulkEnrichment(
+        output=args.output,
+        checkpoint=checkpoint,
+        concurrency=args.concurrency or settings.batch_concurrency,
+        language=args.language,
+        include=[part for part in args.include.split(",") if part],
+        timeout=args.timeout or settings.request_timeout,
+        retries=args.retries,
+    )
+
+    # Same priority as API batch requests, should the job share a process with them.
+    request_priority.set(BATCH)
+    await genre_catalog.start(settings.genre_catalog_languages)
+    try:
+        await job.run(read_rows(args.input), total, args.progress_interval)
+    finally:
+        await genre_catalog.stop()
+        await HttpPool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enrich a CSV/JSONL catalog of movies with movie details and release day weather.")
+    parser.add_argument("input", help="The catalog (.csv with a header row or .jsonl, optionally .gz)")
+    parser.add_argument("--output", required=True, help="The JSONL file to append results to")
+    parser.add_argument("--checkpoint", help="The checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--concurrency", type=int, help="Rows processed at the same time (default: BATCH_CONCURRENCY)")
+    parser.add_argument("--language", default="en-US", help="Language for rows without one")
+    parser.add_argument("--include", default="", help="Comma-separated extra movie data, as in the API's include field")
+    parser.add_argument("--timeout", type=float, help="Seconds allowed per lookup (default: REQUEST_TIMEOUT)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries of a lookup that was throttled or timed out")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines (0 disables them)")
+    parser.add_argument("--no-count", action="store_true", help="Do not count the input rows up front (no ETA)")
+    args = parser.parse_args()
+
+    unknown = [part for part in args.include.split(",") if part and part not in typing.get_args(MovieInclude)]
+    if unknown:
+        parser.error(f"unknown --include {', '.join(unknown)}; choose from {', '.join(typing.get_args(MovieInclude))}")
+
+    try:
+        asyncio.run(enrich(args))
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+
+
+if __name__ == "__main__":
+    main()
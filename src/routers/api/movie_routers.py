@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from src.helpers.admission.admission import admission_controlled
 from src.schemas.full_data_request import FullDataRequest
 from src.schemas.partial_data_request import PartialDataRequest
 
@@ -10,7 +11,7 @@ api_movies_router = APIRouter(prefix="/api/v1/movies", tags=["movies"])
 
 api_movies_router.add_api_route(
     path="/search-movie",
-    endpoint=MovieController.search_movie_by_title,
+    endpoint=admission_controlled("search-movie", MovieController.search_movie_by_title, fallback=MovieController.search_movie_from_cache),
     methods=["POST"],
     summary="Search movie by title",
     description="Search for a movie by title and retrieve detailed information.",
@@ -18,8 +19,34 @@ api_movies_router.add_api_route(
 
 api_movies_router.add_api_route(
     path="/get-movie-and-weather-data",
-    endpoint=MovieController.get_movie_and_weather_data,
+    endpoint=admission_controlled("get-movie-and-weather-data", MovieController.get_movie_and_weather_data, fallback=MovieController.movie_and_weather_data_from_cache),
     methods=["POST"],
     summary="Get movie data",
     description="Find information about your favorite movies and the maximum and minimum temperature in your city on the day of their release.",
 )
+
+api_movies_router.add_api_route(
+    path="/get-movie-and-weather-data/stream",
+    endpoint=admission_controlled("get-movie-and-weather-data/stream", MovieController.stream_movie_and_weather_data),
+    methods=["POST"],
+    summary="Stream movie data",
+    description="Same as get-movie-and-weather-data, but the movie is sent as soon as it is found and the release day weather follows. Server-Sent Events with Accept: text/event-stream, newline-delimited JSON otherwise.",
+)
+
+api_movies_router.add_api_route(
+    path="/suggest",
+    endpoint=admission_controlled("suggest", MovieController.suggest),
+    methods=["GET"],
+    summary="Suggest movie titles",
+    description="Suggest movie titles for a prefix while the user types. Answered from memory, without calling TMDB.",
+)
+
+
+api_movies_router.add_api_route(
+    path="/batch",
+    # Admission is per item, not per request: see MovieController.batch.
+    endpoint=MovieController.batch,
+    methods=["POST"],
+    summary="Resolve many movies at once",
+    description="Resolve a list of movies concurrently. Results are streamed back as newline-delimited JSON as soon as each one finishes, each with its own index and status.",
+)
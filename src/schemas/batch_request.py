@@ -0,0 +1,25 @@
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field
+
+from src.helpers.settings.settings import get_settings
+from src.schemas.full_data_request import FullDataRequest
+from src.schemas.partial_data_request import PartialDataRequest
+
+class BatchRequest(BaseModel):
+    items: List[Union[FullDataRequest, PartialDataRequest]] = Field(
+        ...,
+        min_length=1,
+        max_length=get_settings().batch_max_items,
+        description="Movies to resolve. Items with coordinates also get the release day weather",
+        examples=[[
+            {"movie_title": "Inception", "language": "en-US"},
+            {"movie_title": "Deadpool & Wolverine", "language": "en-US", "latitude": 11.2361, "longitude": -74.20167},
+        ]],
+    )
+    concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        le=get_settings().batch_max_concurrency,
+        description="Maximum number of items resolved at the same time",
+        examples=[16],
+    )
@@ -1,8 +1,11 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from src.schemas.movie_include import MovieInclude
+
 class FullDataRequest(BaseModel):
     movie_title: str = Field(..., description="The title of the movie", examples=["Deadpool & Wolverine"])
     language: str = Field(..., description="The language for the request", examples=["en-US"])
     latitude: float = Field(..., description="Latitude coordinate", examples=[11.2361])
     longitude: float = Field(..., description="Longitude coordinate", examples=[-74.20167])
+    include: List[MovieInclude] = Field(default_factory=list, description="Extra movie data returned under \"included\", fetched from TMDB in one call", examples=[["details", "release_dates", "credits"]])
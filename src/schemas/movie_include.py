@@ -0,0 +1,19 @@
+from typing import Literal
+
+# Extra movie data a client can ask for. "details" adds runtime, tagline, budget and
+# the like; every other name is a TMDB sub-resource fetched with append_to_response.
+MovieInclude = Literal[
+    "details",
+    "release_dates",
+    "credits",
+    "videos",
+    "images",
+    "keywords",
+    "external_ids",
+    "alternative_titles",
+    "translations",
+    "recommendations",
+    "similar",
+    "reviews",
+]
+
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+class _Projectable:
+    """
+    Helpers shared by the slot-based response models.
+
+    The models are plain dataclasses with ``__slots__``: cheap to build, and
+    serialized natively by orjson without going through ``jsonable_encoder``.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+    @classmethod
+    def parse_fields(cls, fields: str | None) -> Optional[Tuple[str, ...]]:
+        """
+        Parses a comma-separated ``fields`` projection.
+
+        Args:
+            fields (str | None): The requested fields, e.g. "title,genres,release_date".
+        Returns:
+            Optional[Tuple[str, ...]]: The field names, or None to return every field.
+
+        Raises:
+            ValueError: If a requested field does not exist.
+        """
+        if not fields:
+            return None
+
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in cls.__dataclass_fields__]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(cls.__dataclass_fields__)}.")
+        return names or None
+
+    def project(self, fields: Optional[Tuple[str, ...]]):
+        """
+        Keeps only the requested fields.
+
+        Args:
+            fields (Optional[Tuple[str, ...]]): The fields to keep, or None to keep all of them.
+        Returns:
+            The model itself when every field is kept, otherwise a dict of the requested fields.
+        """
+        if fields is None:
+            return self
+        return {name: getattr(self, name) for name in fields}
+
+
+@dataclass(slots=True)
+class ReleaseDayWeather(_Projectable):
+    temperature_max: Optional[float]
+    temperature_min: Optional[float]
+    message: str
+
+
+@dataclass(slots=True)
+class MovieDetails(_Projectable):
+    title: str
+    genres: List[str]
+    release_date: str
+    adult: bool = False
+    backdrop_path: Optional[str] = ''
+    original_language: str = ''
+    original_title: str = ''
+    overview: str = ''
+    popularity: float = 0.0
+    poster_path: Optional[str] = ''
+    video: bool = False
+    vote_average: float = 0.0
+    vote_count: int = 0
+
+
+@dataclass(slots=True)
+class MovieWithWeather(MovieDetails):
+    id: int = 0
+    release_day_weather: Optional[ReleaseDayWeather] = None
+
+    def __post_init__(self) -> None:
+        if isinstance(self.release_day_weather, dict):
+            self.release_day_weather = ReleaseDayWeather.from_dict(self.release_day_weather)
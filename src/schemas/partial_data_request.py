@@ -1,5 +1,9 @@
+from typing import List
 from pydantic import BaseModel, Field
 
+from src.schemas.movie_include import MovieInclude
+
 class PartialDataRequest(BaseModel):
     movie_title: str = Field(...,description="Title of the movie to search for", examples=["Inception"])
     language: str = Field(..., description="Language of the movie", examples=["en-US"])
+    include: List[MovieInclude] = Field(default_factory=list, description="Extra movie data returned under \"included\", fetched from TMDB in one call", examples=[["details", "release_dates", "credits"]])
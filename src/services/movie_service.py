@@ -1,23 +1,63 @@
-from src.utils.tmdb_utils import get_movie_details, get_movie_genres
-from src.utils.weather_utils import get_weather_for_date
+import time
+
+from typing import AsyncIterator, Sequence
+
+from src.helpers.fetch.deadline import DeadlineExceededError
+from src.helpers.metrics.metrics import record_timing, service_step_seconds
+from src.helpers.task_graph.task_graph import TaskGraph
+from src.utils.suggest_utils import remember_title
+from src.utils.tmdb_utils import enrich_movie, get_movie_details, get_movie_genres, peek_enrichment, peek_movie_details, preload_genres
+from src.utils.weather_utils import get_weather_for_date, peek_weather_for_date
+
+
+class MovieNotFoundError(Exception):
+    """
+    Raised when no movie matches the requested title.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("This movie not found.")
 
 
 class MovieService:
 
     @staticmethod
-    def search_movie_by_title(title: str, language: str) -> dict:
+    def __record(operation: str, step: str, duration: float) -> None:
+        service_step_seconds.observe(duration, operation, step)
+        record_timing(step, duration)
+
+
+    @staticmethod
+    async def search_movie_by_title(title: str, language: str, include: Sequence[str] = ()) -> dict:
         """
         Search a movie by title
 
         Args:
             title (str): The title of the movie to search for.
             language (str): The language in which to search for the movie.
+            include (Sequence[str]): Extra data to fetch (see MovieInclude), returned under 'included'.
         Returns:
-            dict: A dictionary containing the movie details.
+            dict: A dictionary containing the movie details, or an empty dictionary if the movie is not found.
         """
 
-        movie = get_movie_details(title=title, language=language)
-        movie['genres'] = get_movie_genres(movie['genre_ids'])
+        started = time.perf_counter()
+        movie = await get_movie_details(title=title, language=language)
+        MovieService.__record("search_movie", "search", time.perf_counter() - started)
+
+        if not movie:
+            return {}
+
+        remember_title(movie)
+
+        started = time.perf_counter()
+        movie['genres'] = await get_movie_genres(movie['genre_ids'], language)
+        MovieService.__record("search_movie", "genres", time.perf_counter() - started)
+
+        if include:
+            started = time.perf_counter()
+            movie['included'] = await enrich_movie(movie['id'], language, include)
+            MovieService.__record("search_movie", "enrichment", time.perf_counter() - started)
+
         movie.pop('genre_ids')
         movie.pop('id')
 
@@ -25,36 +65,193 @@ class MovieService:
 
 
     @staticmethod
-    def get_movie_and_weather_data(title: str, language: str, latitude: float, longitude: float, start_date: str, end_date: str) -> dict:
+    async def get_movie_and_weather_data(title: str, language: str, latitude: float, longitude: float, include: Sequence[str] = ()) -> tuple[dict, dict]:
         """
-        Retrieve movie details and weather data for a specific date range.
+        Retrieve movie details and the weather data for the movie's release date.
 
+        Args:
+            title (str): The title of the movie to search for.
+            language (str): The language in which to search for the movie.
             latitude (float): The latitude coordinate for the weather data.
             longitude (float): The longitude coordinate for the weather data.
-            start_date (str): The start date for the weather data in 'YYYY-MM-DD' format.
-            end_date (str): The end date for the weather data in 'YYYY-MM-DD' format.
+            include (Sequence[str]): Extra data to fetch (see MovieInclude), returned under 'included'.
+        Returns:
+            tuple[dict, dict]: The movie details with the release day weather, and the per-step timings in milliseconds.
+
+        Raises:
+            MovieNotFoundError: If the movie is not found.
+            DeadlineExceededError: If the request's deadline passes before the movie is found.
+        """
+        movie_data, timings = {}, {}
+
+        async for event, data in MovieService.stream_movie_and_weather_data(title, language, latitude, longitude, include):
+            if event == 'movie':
+                movie_data = data
+            elif event in ('release_day_weather', 'included'):
+                movie_data[event] = data
+            else:
+                timings = data
+
+        return movie_data, timings
+
+
+    @staticmethod
+    async def stream_movie_and_weather_data(title: str, language: str, latitude: float, longitude: float, include: Sequence[str] = ()) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Retrieve movie details and the release day weather, yielding each part as soon as it is ready.
 
-            dict: A dictionary containing the movie details and weather data for the specified date range.
+        The upstream calls run as a dependency graph: the search and the genre catalog
+        load start together, and the weather lookup, genre mapping and enrichment start
+        as soon as the search result is available.
+
+        Args:
+            title (str): The title of the movie to search for.
+            language (str): The language in which to search for the movie.
+            latitude (float): The latitude coordinate for the weather data.
+            longitude (float): The longitude coordinate for the weather data.
+            include (Sequence[str]): Extra data to fetch (see MovieInclude).
+        Yields:
+            tuple[str, dict]: ("movie", the movie details with genres), then ("release_day_weather", the weather)
+                              and, when asked for, ("included", the extra data) in the order they finish,
+                              then ("timings", the per-step timings in milliseconds).
 
         Raises:
-            ValueError: If the movie is not found.
+            MovieNotFoundError: If the movie is not found.
+            DeadlineExceededError: If the request's deadline passes before the movie is found.
+                                   A weather lookup that runs out of time is reported in the weather message instead.
         """
-        movie_data = get_movie_details(title=title, language=language)
+        async def search() -> dict:
+            movie_data = await get_movie_details(title=title, language=language)
 
-        if not movie_data:
-            raise ValueError("This movie not found.")
+            if not movie_data:
+                raise MovieNotFoundError()
 
-        movie_data['genres'] = get_movie_genres(movie_data['genre_ids'])
+            remember_title(movie_data)
+            return movie_data
 
-        movie_data.pop('genre_ids')
+        async def genres(search: dict, genre_catalog: None) -> list:
+            return await get_movie_genres(search['genre_ids'], language)
 
-        weather_data = get_weather_for_date(
-            latitude=latitude,
-            longitude=longitude,
-            start_date=start_date,
-            end_date=end_date
+        async def weather(search: dict) -> dict:
+            try:
+                return await get_weather_for_date(
+                    latitude=latitude,
+                    longitude=longitude,
+                    day=search.get('release_date')
+                )
+            except DeadlineExceededError:
+                # The movie is already known: answer with it rather than with a 504.
+                return {
+                    'temperature_max': None,
+                    'temperature_min': None,
+                    'message': 'Weather data took too long to fetch.'
+                }
+
+        async def enrichment(search: dict) -> dict:
+            return await enrich_movie(search['id'], language, include)
+
+        graph = (
+            TaskGraph()
+            .add("search", search)
+            .add("genre_catalog", lambda: preload_genres(language))
+            .add("genres", genres, depends_on=["search", "genre_catalog"])
+            .add("weather", weather, depends_on=["search"])
         )
+        if include:
+            graph.add("enrichment", enrichment, depends_on=["search"])
+
+        # The movie goes out once its genres are mapped; weather or extra data that
+        # is ready earlier is held back so that it always follows the movie.
+        events = {'weather': 'release_day_weather', 'enrichment': 'included'}
+        results = {}
+        held = []
+        async for step, result in graph.stream():
+            results[step] = result
 
-        movie_data['release_day_weather'] = weather_data
+            if step == 'genres':
+                movie_data = results['search']
+                movie_data['genres'] = result
+                movie_data.pop('genre_ids')
+                yield 'movie', movie_data
+
+                for event in held:
+                    yield event
+            elif step in events:
+                if 'genres' in results:
+                    yield events[step], result
+                else:
+                    held.append((events[step], result))
+
+        for step, timing in graph.timings.items():
+            if step != 'total':
+                MovieService.__record("movie_and_weather", step, timing['duration_ms'] / 1000)
+
+        yield 'timings', graph.timings
+
+
+    @staticmethod
+    def __cached_movie(title: str, language: str, include: Sequence[str]) -> dict:
+        movie = peek_movie_details(title=title, language=language)
+        if not movie:
+            return {}
+
+        if include:
+            included = peek_enrichment(movie['id'], language, include)
+            if included is None:
+                return {}
+            movie['included'] = included
+
+        movie.pop('genre_ids')
+        return movie
+
+
+    @staticmethod
+    def search_movie_from_cache(title: str, language: str, include: Sequence[str] = ()) -> dict:
+        """
+        Search a movie by title in the caches only, for degraded answers under load.
+
+        Args:
+            title (str): The title of the movie to search for.
+            language (str): The language in which to search for the movie.
+            include (Sequence[str]): Extra data to return (see MovieInclude), under 'included'.
+        Returns:
+            dict: The same movie details as search_movie_by_title (possibly stale), or an empty
+                  dictionary if the movie or any of the extra data is not cached.
+        """
+        movie = MovieService.__cached_movie(title, language, include)
+        movie.pop('id', None)
+
+        return movie
+
+
+    @staticmethod
+    def movie_and_weather_data_from_cache(title: str, language: str, latitude: float, longitude: float, include: Sequence[str] = ()) -> dict:
+        """
+        Retrieve movie details and the release day weather from the caches only, for degraded answers under load.
+
+        Args:
+            title (str): The title of the movie to search for.
+            language (str): The language in which to search for the movie.
+            latitude (float): The latitude coordinate for the weather data.
+            longitude (float): The longitude coordinate for the weather data.
+            include (Sequence[str]): Extra data to return (see MovieInclude), under 'included'.
+        Returns:
+            dict: The same movie details with the release day weather as get_movie_and_weather_data
+                  (possibly stale), or an empty dictionary if the movie or any of the extra data is
+                  not cached. Weather that is not cached is reported in the weather message.
+        """
+        movie_data = MovieService.__cached_movie(title, language, include)
+        if not movie_data:
+            return {}
+
+        movie_data['release_day_weather'] = peek_weather_for_date(
+            latitude=latitude,
+            longitude=longitude,
+            day=movie_data.get('release_date')
+        ) or {
+            'temperature_max': None,
+            'temperature_min': None,
+            'message': 'Weather data is temporarily unavailable.'
+        }
 
         return movie_data
@@ -0,0 +1,62 @@
+from typing import List
+
+from src.helpers.cache.ttl_cache import TTLCache
+from src.helpers.settings.settings import get_settings
+from src.helpers.title_index.title_index import IndexedTitle, normalize
+from src.helpers.typeahead.typeahead import Typeahead
+from src.utils.tmdb_utils import title_index
+
+settings = get_settings()
+
+typeahead = Typeahead(
+    max_titles=settings.suggest_max_titles,
+)
+
+suggest_cache = TTLCache(
+    ttl=settings.suggest_cache_ttl,
+    max_entries=settings.suggest_cache_max_entries,
+)
+
+
+def remember_title(movie: dict) -> None:
+    """
+    Feeds a movie that was looked up into the typeahead.
+
+    Args:
+        movie (dict): The movie details, with at least 'id', 'title' and 'popularity'.
+    """
+    if movie.get('id'):
+        typeahead.add(movie['id'], movie['title'], float(movie.get('popularity') or 0.0))
+
+
+def suggest_titles(prefix: str, limit: int) -> List[IndexedTitle]:
+    """
+    Returns title suggestions for a prefix, from the titles users looked up and the local title index.
+
+    Works entirely in memory; results are cached per prefix for a few seconds.
+
+    Args:
+        prefix (str): The prefix as typed.
+        limit (int): The maximum number of suggestions.
+    Returns:
+        List[IndexedTitle]: The suggestions, most popular first.
+    """
+    key = (normalize(prefix), limit)
+    suggestions = suggest_cache.get(key)
+    if suggestions is not None:
+        return suggestions
+
+    candidates = typeahead.suggest(prefix, limit)
+    index = title_index.current()
+    if index is not None:
+        candidates += index.prefix(prefix, limit)
+
+    suggestions, seen = [], set()
+    for candidate in sorted(candidates, key=lambda candidate: -candidate.popularity):
+        if candidate.id not in seen:
+            seen.add(candidate.id)
+            suggestions.append(candidate)
+
+    suggestions = suggestions[:limit]
+    suggest_cache.set(key, suggestions)
+    return suggestions
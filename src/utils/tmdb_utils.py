@@ -1,9 +1,19 @@
-from typing import List
+import httpx
 
-from src.helpers.load_env.load_env import LoadEnv
-from src.helpers.fetch.data_fetch import DataFetch
+from typing import Iterable, List
 
-def get_data(extra_url, params):
+from src.helpers.cache.single_flight import SingleFlight
+from src.helpers.cache.sqlite_cache import get_shared_cache
+from src.helpers.cache.ttl_cache import TTLCache
+from src.helpers.fetch.async_data_fetch import AsyncDataFetch
+from src.helpers.genre_catalog.genre_catalog import GenreCatalog
+from src.helpers.settings.settings import get_settings
+from src.helpers.title_index.title_index import TitleIndexFile
+
+settings = get_settings()
+
+
+async def get_data(extra_url, params):
     """
     Fetches data from the TMDB API using the provided extra URL and parameters.
 
@@ -15,43 +25,78 @@ def get_data(extra_url, params):
     Raises:
         Exception: If there is an error during the data fetch process.
     """
-    tmdb_url = LoadEnv("TMDB_URL")
-    tmdb_api_key = LoadEnv("TMDB_API_KEY")
+    params['api_key'] = settings.tmdb_api_key
 
-    params['api_key'] = tmdb_api_key.get_value()
-
-    dataFetch = DataFetch(
-        url=tmdb_url.get_value(),
+    dataFetch = AsyncDataFetch(
+        url=settings.tmdb_url,
         extra_url=extra_url,
         params=params
     )
 
-    return dataFetch.get()
+    return await dataFetch.get()
 
 
-def get_movie_genres(genre_ids: List[int]) -> List[dict]:
+async def fetch_genre_list(language: str) -> List[dict]:
     """
-    Fetches the names of movie genres based on a list of genre IDs.
-    
+    Downloads the full TMDB movie genre list for a language.
+
     Args:
-        genre_ids (List[int]): A list of genre IDs to fetch the names for.
+        language (str): The language of the genre names (e.g., 'en-US').
     Returns:
-        List[dict]: A list of genre names corresponding to the provided genre IDs.
-                    If a genre ID is not found, it will be ignored in the result.
-                    If there is an error fetching the genres, an empty list is returned.
+        List[dict]: The genres as returned by TMDB ({'id': ..., 'name': ...}).
+    Raises:
+        ValueError: If the response does not contain a genre list.
     """
-    response = get_data('/genre/movie/list', {
-        'language': 'en',
+    response = await get_data('/genre/movie/list', {
+        'language': language,
     })
 
-    if 'genres' in response:
-        genres = {genre['id']: genre['name'] for genre in response['genres']}
-        genre_names = [genres[genre_id] for genre_id in genre_ids if genre_id in genres]
-        return genre_names
-    else:
-        print("Error: Unable to fetch genres.")
+    if 'genres' not in response:
+        raise ValueError("Unable to fetch genres.")
+
+    return response['genres']
+
+
+genre_catalog = GenreCatalog(
+    fetch_genres=fetch_genre_list,
+    ttl=settings.genre_catalog_ttl,
+    max_languages=settings.genre_catalog_max_languages,
+)
+
+
+async def preload_genres(language: str) -> None:
+    """
+    Makes sure the genre catalog for a language is loaded, so later lookups need no network I/O.
+
+    Args:
+        language (str): The language of the genre names.
+    """
+    try:
+        await genre_catalog.ensure(language)
+    except Exception as e:
+        print(f"Error: Unable to fetch genres. {e}")
+
+
+async def get_movie_genres(genre_ids: List[int], language: str = 'en') -> List[str]:
+    """
+    Maps movie genre IDs to their names using the in-process genre catalog.
+
+    Args:
+        genre_ids (List[int]): A list of genre IDs to fetch the names for.
+        language (str): The language of the genre names. Loaded on first use if it was not preloaded.
+    Returns:
+        List[str]: A list of genre names corresponding to the provided genre IDs.
+                   If a genre ID is not found, it will be ignored in the result.
+                   If the genres for the language cannot be fetched, an empty list is returned.
+    """
+    try:
+        await genre_catalog.ensure(language)
+    except Exception as e:
+        print(f"Error: Unable to fetch genres. {e}")
         return []
 
+    return genre_catalog.names_for(genre_ids, language)
+
 
 def build_movie_details(movie: dict, genere_ids: dict) -> dict:
     """
@@ -82,9 +127,32 @@ def build_movie_details(movie: dict, genere_ids: dict) -> dict:
     }
 
 
-def get_movie_details(title: str, language: str) -> dict:
+search_cache = TTLCache(
+    ttl=settings.search_cache_ttl,
+    negative_ttl=settings.search_cache_negative_ttl,
+    stale_ttl=settings.search_cache_stale_ttl,
+    max_entries=settings.search_cache_max_entries,
+    max_bytes=settings.search_cache_max_bytes,
+    backend=get_shared_cache(),
+    namespace="tmdb-search",
+)
+
+
+def normalize_title(title: str) -> str:
     """
-    Fetches movie details from the TMDB API based on the given title and language.
+    Normalizes a title for cache lookups: case-folded with collapsed whitespace.
+
+    Args:
+        title (str): The title as typed by the user.
+    Returns:
+        str: The normalized title.
+    """
+    return " ".join(title.casefold().split())
+
+
+async def search_movie(title: str, language: str) -> dict:
+    """
+    Searches TMDB for a title and builds the details of the first result.
 
     Args:
         title (str): The title of the movie to search for.
@@ -94,11 +162,11 @@ def get_movie_details(title: str, language: str) -> dict:
     Raises:
         Exception: If there is an error in fetching data from the API.
     """
-    response = get_data('/search/movie', {
+    response = await get_data('/search/movie', {
         'query': title,
         'language': language,
     })
-    
+
     if 'results' in response and response['results']:
         movie = response['results'][0]
         genre_ids = movie.get('genre_ids', [])
@@ -107,3 +175,238 @@ def get_movie_details(title: str, language: str) -> dict:
     else:
         print("Error: Unable to fetch movie details or movie not found.")
         return {}
+
+
+title_index = TitleIndexFile(
+    path=settings.title_index_path,
+    check_interval=settings.title_index_check_interval,
+)
+
+movie_cache = TTLCache(
+    ttl=settings.movie_cache_ttl,
+    negative_ttl=settings.search_cache_negative_ttl,
+    stale_ttl=settings.search_cache_stale_ttl,
+    max_entries=settings.movie_cache_max_entries,
+    max_bytes=settings.movie_cache_max_bytes,
+    backend=get_shared_cache(),
+    namespace="tmdb-movie",
+)
+
+
+def resolve_title(title: str) -> int | None:
+    """
+    Resolves a title to a TMDB movie id with the local title index, without network I/O.
+
+    Args:
+        title (str): The title as typed by the user.
+    Returns:
+        int | None: The id of the most popular movie with exactly this (normalized) title,
+                    or None if there is no index or no match.
+    """
+    index = title_index.current()
+    if index is None:
+        return None
+
+    matches = index.exact(title)
+    return matches[0].id if matches else None
+
+
+async def fetch_movie(movie_id: int, language: str) -> dict:
+    """
+    Fetches a movie by its TMDB id and builds its details.
+
+    Args:
+        movie_id (int): The TMDB movie id.
+        language (str): The language code for the movie details (e.g., 'en-US').
+    Returns:
+        dict: The movie details, or an empty dictionary if TMDB does not know the id.
+    Raises:
+        Exception: If there is an error in fetching data from the API.
+    """
+    try:
+        movie = await get_data(f'/movie/{movie_id}', {
+            'language': language,
+        })
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {}
+        raise
+
+    genre_ids = [genre['id'] for genre in movie.get('genres', [])]
+
+    return build_movie_details(movie=movie, genere_ids=genre_ids)
+
+
+async def get_movie_details(title: str, language: str) -> dict:
+    """
+    Fetches movie details based on the given title and language.
+
+    The title is resolved with the local title index first and the movie fetched
+    by id (cached per id, so every spelling of a title shares one entry). Titles
+    the index does not know go through the TMDB search, served from the search
+    cache when possible.
+
+    Args:
+        title (str): The title of the movie to search for.
+        language (str): The language code for the movie details (e.g., 'en-US').
+    Returns:
+        dict: A copy of the movie details if found, otherwise an empty dictionary.
+    Raises:
+        Exception: If there is an error in fetching data from the API.
+    """
+    movie_id = resolve_title(title)
+    if movie_id is not None:
+        movie = await movie_cache.get_or_load(
+            (movie_id, language),
+            lambda: fetch_movie(movie_id=movie_id, language=language),
+        )
+        if movie:
+            return dict(movie)
+
+    movie = await search_cache.get_or_load(
+        (normalize_title(title), language),
+        lambda: search_movie(title=title, language=language),
+    )
+
+    return dict(movie)
+
+
+def peek_movie_details(title: str, language: str) -> dict:
+    """
+    Returns the movie details of a title from the caches only, stale or not, without network I/O.
+
+    Args:
+        title (str): The title of the movie to search for.
+        language (str): The language code for the movie details (e.g., 'en-US').
+    Returns:
+        dict: A copy of the cached movie details with their genre names under 'genres',
+              or an empty dictionary if the title is not cached.
+    """
+    movie = None
+    movie_id = resolve_title(title)
+    if movie_id is not None:
+        movie = movie_cache.peek((movie_id, language))
+    if not movie:
+        movie = search_cache.peek((normalize_title(title), language))
+    if not movie:
+        return {}
+
+    movie = dict(movie)
+    movie['genres'] = genre_catalog.names_for(movie['genre_ids'], language)
+    return movie
+
+
+# Fields of /movie/{id} returned for the "details" include.
+DETAIL_FIELDS = ('runtime', 'tagline', 'status', 'budget', 'revenue', 'imdb_id', 'homepage', 'production_countries', 'spoken_languages')
+
+enrichment_cache = TTLCache(
+    ttl=settings.movie_cache_ttl,
+    negative_ttl=settings.search_cache_negative_ttl,
+    max_entries=settings.enrichment_cache_max_entries,
+    max_bytes=settings.enrichment_cache_max_bytes,
+    backend=get_shared_cache(),
+    namespace="tmdb-enrichment",
+)
+
+enrichment_flight = SingleFlight()
+
+_NOT_CACHED = object()
+
+
+async def fetch_movie_parts(movie_id: int, language: str, parts: tuple) -> dict:
+    """
+    Fetches a movie and several of its sub-resources in one request with append_to_response.
+
+    The movie's own details are stored in the movie cache on the way, so a later
+    lookup of the same id needs no request.
+
+    Args:
+        movie_id (int): The TMDB movie id.
+        language (str): The language code for the movie details (e.g., 'en-US').
+        parts (tuple): The includes to fetch (see MovieInclude).
+    Returns:
+        dict: Each requested part by name, or an empty dictionary if TMDB does not know the id.
+    Raises:
+        Exception: If there is an error in fetching data from the API.
+    """
+    params = {'language': language}
+    appended = [part for part in parts if part != 'details']
+    if appended:
+        params['append_to_response'] = ','.join(appended)
+
+    try:
+        movie = await get_data(f'/movie/{movie_id}', params)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return {}
+        raise
+
+    genre_ids = [genre['id'] for genre in movie.get('genres', [])]
+    movie_cache.set((movie_id, language), build_movie_details(movie=movie, genere_ids=genre_ids))
+
+    return {
+        part: {field: movie.get(field) for field in DETAIL_FIELDS} if part == 'details' else movie.get(part)
+        for part in parts
+    }
+
+
+async def enrich_movie(movie_id: int, language: str, include: Iterable[str]) -> dict:
+    """
+    Returns extra data about a movie: details such as the runtime, and TMDB sub-resources
+    such as release dates or credits.
+
+    Each part is cached per movie id and language. The parts that are not cached yet
+    are fetched together in a single /movie/{id} request, so a lookup costs at most
+    one upstream call however many parts are asked for.
+
+    Args:
+        movie_id (int): The TMDB movie id.
+        language (str): The language code for the movie details (e.g., 'en-US').
+        include (Iterable[str]): The parts to return (see MovieInclude).
+    Returns:
+        dict: Each requested part by name; a part TMDB has no data for is None.
+    Raises:
+        Exception: If there is an error in fetching data from the API.
+    """
+    requested = tuple(dict.fromkeys(include))
+    included = {}
+    missing = []
+
+    for part in requested:
+        cached = await enrichment_cache.aget((movie_id, language, part), _NOT_CACHED)
+        if cached is _NOT_CACHED:
+            missing.append(part)
+        else:
+            included[part] = cached
+
+    if missing:
+        parts = tuple(missing)
+        fetched = await enrichment_flight.do(
+            (movie_id, language, parts),
+            lambda: fetch_movie_parts(movie_id=movie_id, language=language, parts=parts),
+        )
+        for part in parts:
+            included[part] = fetched.get(part)
+            if fetched:
+                enrichment_cache.set((movie_id, language, part), included[part])
+
+    return {part: included[part] for part in requested}
+
+
+def peek_enrichment(movie_id: int, language: str, include: Iterable[str]) -> dict | None:
+    """
+    Returns extra data about a movie from the cache only, without network I/O.
+
+    Args:
+        movie_id (int): The TMDB movie id.
+        language (str): The language code for the movie details (e.g., 'en-US').
+        include (Iterable[str]): The parts to return (see MovieInclude).
+    Returns:
+        dict | None: Each requested part by name, or None if any of them is not cached.
+    """
+    included = {}
+    for part in dict.fromkeys(include):
+        included[part] = enrichment_cache.peek((movie_id, language, part), _NOT_CACHED)
+        if included[part] is _NOT_CACHED:
+            return None
+    return included
@@ -1,63 +1,299 @@
-from datetime import date
-from src.helpers.fetch.data_fetch import DataFetch
-from src.helpers.load_env.load_env import LoadEnv
+import asyncio
+import math
 
-def get_weather_for_date(latitude: float, longitude: float, start_date: date, end_date: date) -> dict:
+from datetime import date, timedelta
+from typing import Dict, List, Set, Tuple
+
+from src.helpers.cache.sqlite_cache import get_shared_cache
+from src.helpers.cache.ttl_cache import TTLCache
+from src.helpers.fetch.async_data_fetch import AsyncDataFetch
+from src.helpers.fetch.deadline import shared_context, within_deadline
+from src.helpers.settings.settings import get_settings
+
+Cell = Tuple[float, float]
+DailyTemperatures = Tuple[float | None, float | None]
+
+settings = get_settings()
+
+GRID_DEGREES = settings.weather_grid_degrees
+RECENT_DAYS = settings.weather_recent_days
+RECENT_TTL = settings.weather_cache_recent_ttl
+
+weather_cache = TTLCache(
+    ttl=math.inf,
+    max_entries=settings.weather_cache_max_entries,
+    is_negative=lambda value: False,
+    backend=get_shared_cache(),
+    namespace="weather",
+)
+
+
+def snap_to_grid(latitude: float, longitude: float) -> Cell:
     """
-    Fetches weather data for a given latitude and longitude between specified start and end dates.
+    Snaps coordinates to the centre of their weather grid cell so nearby users share cache entries.
 
     Args:
         latitude (float): The latitude of the location.
         longitude (float): The longitude of the location.
-        start_date (date): The start date for fetching weather data.
-        end_date (date): The end date for fetching weather data.
     Returns:
-        dict: A dictionary containing the maximum and minimum temperatures and a message.
-              If the start date is before 2016-01-01, returns a message indicating no data is available.
-              If the request is successful, returns the temperatures and a success message.
-              If there is an error fetching the data, returns None for temperatures and an error message.
+        Tuple[float, float]: The snapped (latitude, longitude).
     """
-    if date.fromisoformat(start_date) < date(2016, 1, 1):
-        return {
-            'temperature_max': None,
-            'temperature_min': None,
-            'message': 'There is no weather data for movies released before 2016-01-01'
-        }
+    return (
+        round(round(latitude / GRID_DEGREES) * GRID_DEGREES, 4),
+        round(round(longitude / GRID_DEGREES) * GRID_DEGREES, 4),
+    )
+
 
-    open_meteo_url = LoadEnv("WEATHER_URL")
+async def fetch_daily_temperatures(cell: Cell, start_date: date, end_date: date) -> Dict[str, DailyTemperatures] | None:
+    """
+    Fetches the daily maximum and minimum temperatures of a grid cell for a date range in one request.
 
-    dataFetch = DataFetch(
-        url=open_meteo_url.get_value(),
+    Args:
+        cell (Tuple[float, float]): The snapped (latitude, longitude).
+        start_date (date): The first day of the range.
+        end_date (date): The last day of the range.
+    Returns:
+        Dict[str, Tuple] | None: (temperature_max, temperature_min) by ISO date, or None if the response is malformed.
+    """
+    dataFetch = AsyncDataFetch(
+        url=settings.weather_url,
         params={
-        'latitude': latitude,
-        'longitude': longitude,
-        'start_date': start_date,
-        'end_date': end_date,
+        'latitude': cell[0],
+        'longitude': cell[1],
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
         'daily': 'temperature_2m_max,temperature_2m_min',
         'timezone': 'auto'
     })
 
-    response = dataFetch.get()
+    response = await dataFetch.get()
 
-    if response and isinstance(response, dict) and 'daily' in response:
-        temp_max = response['daily'].get('temperature_2m_max', [None])[0]
-        temp_min = response['daily'].get('temperature_2m_min', [None])[0]
+    if not (response and isinstance(response, dict) and 'daily' in response):
+        return None
 
-        if temp_max is None or temp_min is None:
-            return {
-                'temperature_max': temp_max,
-                'temperature_min': temp_min,
-                'message': 'We apologize, but there are no weather records available for the selected date.'
-            }
+    daily = response['daily']
+    days = daily.get('time') or [(start_date + timedelta(days=offset)).isoformat() for offset in range((end_date - start_date).days + 1)]
+    maxima = daily.get('temperature_2m_max') or []
+    minima = daily.get('temperature_2m_min') or []
 
-        return {
-            'temperature_max': temp_max,
-            'temperature_min': temp_min,
-            'message': 'Weather data fetched successfully.'
-        }
-    else:
+    return {
+        day: (maxima[i] if i < len(maxima) else None, minima[i] if i < len(minima) else None)
+        for i, day in enumerate(days)
+    }
+
+
+class WeatherRangeCoalescer:
+    """
+    Coalesces concurrent cache misses for the same grid cell into ranged requests.
+
+    Misses are collected for ``window`` seconds; then one ``start_date``..``end_date``
+    request per cell (split when the span exceeds ``max_span_days``) fills the cache
+    for every day it returns and answers all the waiting callers. If a ranged request
+    fails, its days are retried one by one, so one bad day cannot fail the others.
+    Days within ``archive_lag_days`` of today (or in the future) are not in the
+    archive yet and are answered without a request.
+    """
+
+    def __init__(self, window: float = 0.005, max_span_days: int = 366, archive_lag_days: int = 5) -> None:
+        self.__window = window
+        self.__max_span_days = max_span_days
+        self.__archive_lag_days = archive_lag_days
+        self.__pending: Dict[Cell, Dict[date, asyncio.Future]] = {}
+        # Running flushes, referenced so that they are not garbage-collected mid-flight.
+        self.__flushes: Set[asyncio.Task] = set()
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    async def get(self, cell: Cell, day: date) -> DailyTemperatures | None:
+        """
+        Waits for the temperatures of one day in a cell, sharing the upstream request with other callers.
+
+        Args:
+            cell (Tuple[float, float]): The snapped (latitude, longitude).
+            day (date): The requested day.
+        Returns:
+            Tuple | None: (temperature_max, temperature_min), with None for missing values
+                          (both for days the archive does not cover yet),
+                          or None if the upstream response was malformed.
+        Raises:
+            DeadlineExceededError: If the caller's deadline passes first.
+        """
+        if day > date.today() - timedelta(days=self.__archive_lag_days):
+            return (None, None)
+
+        loop = asyncio.get_running_loop()
+        waiting = self.__pending.get(cell)
+
+        if waiting is None:
+            waiting = self.__pending[cell] = {}
+            # The ranged request is shared, so it runs under its own deadline rather than this caller's.
+            loop.call_later(self.__window, self.__start_flush, cell, context=shared_context())
+
+        future = waiting.get(day)
+        if future is None:
+            future = waiting[day] = loop.create_future()
+        else:
+            self.coalesced += 1
+
+        return await within_deadline(asyncio.shield(future))
+
+    def __spans(self, days: List[date]) -> List[List[date]]:
+        spans: List[List[date]] = []
+        for day in sorted(days):
+            if spans and (day - spans[-1][0]).days < self.__max_span_days:
+                spans[-1].append(day)
+            else:
+                spans.append([day])
+        return spans
+
+    def __start_flush(self, cell: Cell) -> None:
+        task = asyncio.ensure_future(self.__flush(cell))
+        self.__flushes.add(task)
+        task.add_done_callback(self.__flushes.discard)
+
+    async def __flush(self, cell: Cell) -> None:
+        waiting = self.__pending.pop(cell, {})
+
+        for span in self.__spans(list(waiting)):
+            await self.__fetch_span(cell, span, waiting)
+
+    async def __fetch_span(self, cell: Cell, span: List[date], waiting: Dict[date, asyncio.Future]) -> None:
+        try:
+            self.upstream_calls += 1
+            temperatures = await fetch_daily_temperatures(cell, span[0], span[-1])
+        except Exception as e:
+            if len(span) > 1:
+                await asyncio.gather(*(self.__fetch_span(cell, [day], waiting) for day in span))
+                return
+
+            if not waiting[span[0]].done():
+                waiting[span[0]].set_exception(e)
+                # Mark as retrieved in case every waiter already went away.
+                waiting[span[0]].exception()
+            return
+
+        if temperatures is not None:
+            for day_iso, values in temperatures.items():
+                weather_cache.set((*cell, day_iso), values, ttl=_cache_ttl(date.fromisoformat(day_iso)))
+
+        for day in span:
+            if not waiting[day].done():
+                waiting[day].set_result(None if temperatures is None else temperatures.get(day.isoformat(), (None, None)))
+
+
+weather_coalescer = WeatherRangeCoalescer(
+    window=settings.weather_coalesce_window,
+    max_span_days=settings.weather_max_range_days,
+    archive_lag_days=settings.weather_archive_lag_days,
+)
+
+
+def _cache_ttl(day: date) -> float:
+    # Historical records never change; recent days may still be revised upstream.
+    if day < date.today() - timedelta(days=RECENT_DAYS):
+        return math.inf
+    return RECENT_TTL
+
+
+async def get_weather_for_date(latitude: float, longitude: float, day: str | None) -> dict:
+    """
+    Fetches the weather for a given latitude and longitude on a specific day.
+
+    Coordinates are snapped to the weather grid and results are cached by (cell, day);
+    concurrent misses for the same cell share one ranged upstream request.
+
+    Args:
+        latitude (float): The latitude of the location.
+        longitude (float): The longitude of the location.
+        day (str | None): The day in 'YYYY-MM-DD' format; TMDB leaves it empty for some movies.
+    Returns:
+        dict: A dictionary containing the maximum and minimum temperatures and a message.
+              If the day is missing or malformed, returns a message indicating the release date is unknown.
+              If the day is before 2016-01-01, returns a message indicating no data is available.
+              If the request is successful, returns the temperatures and a success message.
+              If there are no records for the day, returns None for temperatures and an apology message.
+              If there is an error fetching the data, returns None for temperatures and an error message.
+    """
+    requested_day = _release_day(day)
+
+    if requested_day is None:
+        return _no_release_date()
+    if requested_day < date(2016, 1, 1):
+        return _before_records()
+
+    cell = snap_to_grid(latitude, longitude)
+    temperatures = await weather_cache.aget((*cell, requested_day.isoformat()))
+
+    if temperatures is None:
+        temperatures = await weather_coalescer.get(cell, requested_day)
+
+    return _weather_result(temperatures)
+
+
+def peek_weather_for_date(latitude: float, longitude: float, day: str | None) -> dict | None:
+    """
+    Returns the weather for a location and day from the cache only, without network I/O.
+
+    Args:
+        latitude (float): The latitude of the location.
+        longitude (float): The longitude of the location.
+        day (str | None): The day in 'YYYY-MM-DD' format.
+    Returns:
+        dict | None: The same result as get_weather_for_date, or None if the day is not cached.
+    """
+    requested_day = _release_day(day)
+
+    if requested_day is None:
+        return _no_release_date()
+    if requested_day < date(2016, 1, 1):
+        return _before_records()
+
+    temperatures = weather_cache.peek((*snap_to_grid(latitude, longitude), requested_day.isoformat()))
+    return None if temperatures is None else _weather_result(temperatures)
+
+
+def _release_day(day: str | None) -> date | None:
+    try:
+        return date.fromisoformat(day) if day else None
+    except ValueError:
+        return None
+
+
+def _no_release_date() -> dict:
+    return {
+        'temperature_max': None,
+        'temperature_min': None,
+        'message': 'There is no weather data for movies without a release date'
+    }
+
+
+def _before_records() -> dict:
+    return {
+        'temperature_max': None,
+        'temperature_min': None,
+        'message': 'There is no weather data for movies released before 2016-01-01'
+    }
+
+
+def _weather_result(temperatures: DailyTemperatures | None) -> dict:
+    if temperatures is None:
         return {
             'temperature_max': None,
             'temperature_min': None,
             'message': 'Error fetching weather data.'
         }
+
+    temp_max, temp_min = temperatures
+
+    if temp_max is None or temp_min is None:
+        return {
+            'temperature_max': temp_max,
+            'temperature_min': temp_min,
+            'message': 'We apologize, but there are no weather records available for the selected date.'
+        }
+
+    return {
+        'temperature_max': temp_max,
+        'temperature_min': temp_min,
+        'message': 'Weather data fetched successfully.'
+    }
@@ -1,23 +1,204 @@
-import json
-import requests
+import asyncio
+import random
+import time
 
-from src.helpers.load_env.load_env import LoadEnv
+from urllib.parse import urlsplit
 
-def send_to_webhook(data: dict):
+from src.helpers.fetch.http_pool import HttpPool
+from src.helpers.metrics.metrics import upstream_request_seconds
+from src.helpers.settings.settings import get_settings
+
+
+class WebhookDispatcher:
     """
-    Sends a dictionary of data to a specified webhook URL.
+    Delivers webhook events off the request path.
+
+    Events are put on a bounded in-memory queue and drained by ``concurrency``
+    background workers that post them one by one or, with ``batch_size`` above 1,
+    in batches (by count or by time), retrying failed deliveries with exponential
+    backoff and full jitter. When the queue is full, or no worker is running
+    because there is no webhook URL, new events are dropped and counted.
+    Pending events are flushed on shutdown, bounded by ``shutdown_timeout``.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        batch_size: int = 1,
+        concurrency: int = 8,
+        batch_interval: float = 1.0,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 30.0,
+        shutdown_timeout: float = 10.0,
+    ) -> None:
+        self.__queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.__batch_size = batch_size
+        self.__concurrency = concurrency
+        self.__batch_interval = batch_interval
+        self.__max_retries = max_retries
+        self.__retry_base_delay = retry_base_delay
+        self.__retry_max_delay = retry_max_delay
+        self.__shutdown_timeout = shutdown_timeout
+
+        self.__url: str | None = None
+        self.__workers: list[asyncio.Task] = []
+        self.__closing = False
+
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    def stats(self) -> dict:
+        return {
+            'queued': self.__queue.qsize(),
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'retries': self.retries,
+            'batches': self.batches,
+        }
+
+    def enqueue(self, data: dict) -> bool:
+        """
+        Queues an event without waiting.
+
+        Args:
+            data (dict): The event payload.
+        Returns:
+            bool: True if the event was queued, False if it was dropped because the queue is full
+                  or no worker is running.
+        """
+        if not self.__workers:
+            self.dropped += 1
+            return False
+
+        try:
+            self.__queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+        self.enqueued += 1
+        return True
+
+    def start(self, url: str | None) -> None:
+        """
+        Starts the background workers.
+
+        Args:
+            url (str | None): The webhook URL. If it is not set, events are discarded.
+        """
+        if not url:
+            print("Warning: WEBHOOK_URL is not set, webhook events will be discarded.")
+            return
+
+        self.__url = url
+        self.__closing = False
+        if not self.__workers:
+            self.__workers = [asyncio.create_task(self.__run()) for _ in range(self.__concurrency)]
+
+    async def stop(self) -> None:
+        """
+        Flushes the queued events and stops the workers.
+        """
+        if not self.__workers:
+            return
+
+        self.__closing = True
+        try:
+            await asyncio.wait_for(asyncio.gather(*self.__workers), timeout=self.__shutdown_timeout)
+        except asyncio.TimeoutError:
+            self.dropped += self.__queue.qsize()
+            print("Warning: Webhook queue was not fully flushed before shutdown.")
+        finally:
+            self.__workers = []
+
+    async def __run(self) -> None:
+        while True:
+            batch = await self.__next_batch()
+
+            if batch:
+                await self.__deliver(batch)
+            elif self.__closing:
+                return
+
+    async def __next_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = []
+        deadline = loop.time() + self.__batch_interval
+
+        while len(batch) < self.__batch_size:
+            if self.__closing and self.__queue.empty():
+                break
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.__queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def __deliver(self, batch: list) -> None:
+        # A single-event batch keeps the original one-object payload.
+        payload = batch[0] if self.__batch_size == 1 else batch
+        client = HttpPool.client_for(self.__url)
+        parts = urlsplit(self.__url)
+
+        for attempt in range(self.__max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await client.post(self.__url, json=payload)
+                upstream_request_seconds.observe(time.perf_counter() - started, parts.netloc, parts.path or "/", str(response.status_code))
+                if response.is_success:
+                    self.delivered += len(batch)
+                    self.batches += 1
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+            except Exception as e:
+                upstream_request_seconds.observe(time.perf_counter() - started, parts.netloc, parts.path or "/", "error")
+                print(f"Error: Failed to send data to webhook: {e}")
+
+            if attempt < self.__max_retries:
+                self.retries += 1
+                delay = min(self.__retry_max_delay, self.__retry_base_delay * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+
+        print("Failed to send data to webhook.")
+        self.failed += len(batch)
+
+
+settings = get_settings()
+
+webhook_dispatcher = WebhookDispatcher(
+    queue_size=settings.webhook_queue_size,
+    batch_size=settings.webhook_batch_size,
+    concurrency=settings.webhook_concurrency,
+    batch_interval=settings.webhook_batch_interval,
+    max_retries=settings.webhook_max_retries,
+    retry_base_delay=settings.webhook_retry_base_delay,
+    retry_max_delay=settings.webhook_retry_max_delay,
+    shutdown_timeout=settings.webhook_shutdown_timeout,
+)
+
+
+def send_to_webhook(data: dict) -> bool:
+    """
+    Queues a dictionary of data for asynchronous delivery to the webhook URL.
 
     Args:
         data (dict): The data to be sent to the webhook.
     Returns:
-        int: The HTTP status code of the response.
-    Raises:
-        EnvironmentError: If the 'WEBHOOK_URL' environment variable is not set.
-        requests.exceptions.RequestException: If there is an issue with the HTTP request.
+        bool: True if the data was queued, False if it was dropped because the queue is full
+              or no webhook URL is configured.
     """
-    webhook_url = LoadEnv("WEBHOOK_URL")
-    response = requests.post(webhook_url.get_value(), json=data)
-
-    if response.status_code != 200:
-        print("Failed to send data to webhook.")
-    return response.status_code
+    return webhook_dispatcher.enqueue(data)
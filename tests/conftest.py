@@ -0,0 +1,49 @@
+import os
+import sys
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings are validated on first use; the tests never reach these URLs.
+for name, value in {
+    "TMDB_URL": "http://tmdb.test/3",
+    "TMDB_API_KEY": "test",
+    "WEATHER_URL": "http://weather.test/v1/archive",
+    "HOST": "127.0.0.1",
+    "PORT": "8000",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ.pop("SHARED_CACHE_PATH", None)
+
+
+class FakeClock:
+    """
+    A monotonic clock that only moves when told to.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Returns a function that swaps a module's ``time`` for a FakeClock and returns the clock.
+    """
+    fake = FakeClock()
+
+    def install(module) -> FakeClock:
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=fake.monotonic))
+        return fake
+
+    return install
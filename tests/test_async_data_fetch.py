@@ -0,0 +1,51 @@
+import asyncio
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.helpers.fetch.async_data_fetch import AsyncDataFetch
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    """
+    Returns a function that runs a hedged GET whose two attempts behave as the given coroutine functions.
+    """
+    def run(first, second):
+        attempts = iter([first, second])
+
+        async def send(self, method, host, route, **kwargs):
+            return await next(attempts)()
+
+        monkeypatch.setattr(AsyncDataFetch, "_AsyncDataFetch__send", send)
+        monkeypatch.setattr(AsyncDataFetch, "_AsyncDataFetch__hedge_delay", staticmethod(lambda host, route: 0.01))
+        scheduler = SimpleNamespace(bucket=SimpleNamespace(try_take=lambda: True), hedged=0)
+
+        fetch = AsyncDataFetch("http://tmdb.test/3/search/movie")
+        return asyncio.run(fetch._AsyncDataFetch__send_hedged(scheduler, "tmdb.test", "/3/search/movie"))
+
+    return run
+
+
+async def _cancelled():
+    await asyncio.sleep(0.02)
+    raise asyncio.CancelledError()
+
+
+def test_cancelled_attempt_falls_through_to_the_hedge(hedged):
+    async def answer():
+        await asyncio.sleep(0.03)
+        return "response"
+
+    assert hedged(_cancelled, answer) == "response"
+
+
+def test_real_error_is_raised_when_no_attempt_answers(hedged):
+    async def fail():
+        await asyncio.sleep(0.03)
+        raise httpx.ConnectError("connection refused")
+
+    with pytest.raises(httpx.ConnectError):
+        hedged(_cancelled, fail)
@@ -0,0 +1,55 @@
+import asyncio
+
+import orjson
+
+from src.controllers import movie_controllers
+from src.controllers.movie_controllers import MovieController
+from src.helpers.admission.admission import AdmissionController
+from src.schemas.batch_request import BatchRequest
+from src.services.movie_service import MovieService
+
+
+def _run_batch(monkeypatch, controller: AdmissionController, items: int, concurrency: int):
+    in_flight = peak = 0
+
+    async def search_movie_by_title(title, language, include):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"title": title, "genres": [], "release_date": "2020-01-01"}
+
+    monkeypatch.setattr(MovieService, "search_movie_by_title", search_movie_by_title)
+    monkeypatch.setattr(movie_controllers, "send_to_webhook", lambda movie: None)
+    monkeypatch.setattr(AdmissionController, "_controllers", {"batch": controller})
+
+    request = BatchRequest(items=[{"movie_title": f"Movie {index}", "language": "en-US"} for index in range(items)], concurrency=concurrency)
+
+    async def scenario():
+        response = await MovieController.batch(request)
+        return [orjson.loads(line) async for line in response.body_iterator]
+
+    return asyncio.run(scenario()), peak
+
+
+def test_each_batch_item_holds_one_admission_slot(monkeypatch):
+    controller = AdmissionController("batch", max_concurrency=2, max_queue=64, max_queue_wait=5)
+
+    lines, peak = _run_batch(monkeypatch, controller, items=10, concurrency=8)
+
+    assert sorted(line["index"] for line in lines) == list(range(10))
+    assert all(line["status"] == 200 for line in lines)
+    assert peak == 2
+    assert controller.stats()["admitted"] == 10
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_items_beyond_the_admission_queue_are_shed_with_503(monkeypatch):
+    controller = AdmissionController("batch", max_concurrency=1, max_queue=1, max_queue_wait=5)
+
+    lines, _ = _run_batch(monkeypatch, controller, items=4, concurrency=4)
+
+    statuses = sorted(line["status"] for line in lines)
+    assert statuses == [200, 200, 503, 503]
+    assert all(line["retry_after"] >= 1 for line in lines if line["status"] == 503)
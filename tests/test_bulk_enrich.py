@@ -0,0 +1,141 @@
+import asyncio
+
+import orjson
+import pytest
+
+from src.jobs.bulk_enrich import BulkEnrichment, Checkpoint
+from src.services.movie_service import MovieNotFoundError, MovieService
+
+ROWS = 30
+
+
+def _rows():
+    # Distinct titles, so that no two rows share a lookup.
+    return ((number, {"movie_title": f"Movie {number}", "latitude": 40.4, "longitude": -3.7}) for number in range(ROWS))
+
+
+def _job(output, checkpoint) -> BulkEnrichment:
+    return BulkEnrichment(output=str(output), checkpoint=checkpoint, concurrency=3, language="en-US", include=[], timeout=5, retries=0)
+
+
+def _output_rows(output) -> list:
+    return [orjson.loads(line)["row"] for line in output.read_bytes().splitlines()]
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """
+    Replaces the upstream lookup; calls beyond ``limit`` block until ``release`` is set.
+    """
+    class Lookups:
+        calls = 0
+        limit = None
+        release = None
+
+    async def get_movie_and_weather_data(title, language, latitude, longitude, include):
+        Lookups.calls += 1
+        if Lookups.limit is not None and Lookups.calls > Lookups.limit:
+            await Lookups.release.wait()
+        await asyncio.sleep(0)
+        return {"id": Lookups.calls, "title": title, "genres": [], "release_date": "2020-01-01"}, {}
+
+    monkeypatch.setattr(MovieService, "get_movie_and_weather_data", get_movie_and_weather_data)
+    return Lookups
+
+
+def test_resumed_run_writes_every_row_exactly_once(tmp_path, lookups):
+    output = tmp_path / "catalog.enriched.jsonl"
+    checkpoint_path = str(tmp_path / "catalog.checkpoint")
+
+    async def interrupted_run():
+        lookups.limit = 10
+        lookups.release = asyncio.Event()
+        job = _job(output, Checkpoint(checkpoint_path, str(output)))
+        run = asyncio.create_task(job.run(_rows(), ROWS, progress_interval=0))
+        while job.written < 10:
+            await asyncio.sleep(0)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+    asyncio.run(interrupted_run())
+    assert sorted(_output_rows(output)) == list(range(10))
+
+    # The process died while writing one more line.
+    with open(output, "ab") as file:
+        file.write(b'{"row": 10, "status": 2')
+
+    checkpoint = Checkpoint(checkpoint_path, str(output))
+    checkpoint.load()
+    assert checkpoint.next_row == 10
+
+    lookups.limit = None
+    job = _job(output, checkpoint)
+    asyncio.run(job.run(_rows(), ROWS, progress_interval=0))
+
+    assert sorted(_output_rows(output)) == list(range(ROWS))
+    assert job.skipped == 10
+    assert job.written == ROWS - 10
+
+
+def test_lines_written_after_the_last_save_are_recovered(tmp_path):
+    output = tmp_path / "out.jsonl"
+    checkpoint = Checkpoint(str(tmp_path / "out.checkpoint"), str(output))
+    first = orjson.dumps({"row": 0, "status": 200}) + b"\n"
+    output.write_bytes(first)
+    checkpoint.mark_done(0)
+    checkpoint.save(len(first))
+
+    # Rows finish out of order; 2 and 3 made it to the output before the crash.
+    with open(output, "ab") as file:
+        file.write(orjson.dumps({"row": 3, "status": 200}) + b"\n")
+        file.write(orjson.dumps({"row": 2, "status": 404}) + b"\n")
+        file.write(b'{"row": 1')
+
+    restored = Checkpoint(str(tmp_path / "out.checkpoint"), str(output))
+    restored.load()
+
+    assert restored.next_row == 1
+    assert [restored.is_done(row) for row in range(5)] == [True, False, True, True, False]
+    assert output.read_bytes().endswith(b"\n")
+    assert _output_rows(output) == [0, 3, 2]
+
+
+def test_load_refuses_an_output_shorter_than_the_checkpoint(tmp_path):
+    output = tmp_path / "out.jsonl"
+    checkpoint = Checkpoint(str(tmp_path / "out.checkpoint"), str(output))
+    output.write_bytes(b"")
+    checkpoint.save(100)
+
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmp_path / "out.checkpoint"), str(output)).load()
+
+
+def test_invalid_rows_are_written_with_status_400(tmp_path, lookups):
+    output = tmp_path / "out.jsonl"
+    job = _job(output, Checkpoint(str(tmp_path / "out.checkpoint"), str(output)))
+
+    asyncio.run(job.run(iter([(0, {"movie_title": "Dune"})]), 1, progress_interval=0))
+
+    line = orjson.loads(output.read_bytes())
+    assert line["row"] == 0
+    assert line["status"] == 400
+    assert lookups.calls == 0
+
+
+def test_only_a_missing_movie_is_written_as_404(tmp_path, monkeypatch):
+    output = tmp_path / "out.jsonl"
+
+    async def get_movie_and_weather_data(title, language, latitude, longitude, include):
+        if title == "Missing":
+            raise MovieNotFoundError()
+        raise ValueError("Invalid isoformat string: ''")
+
+    monkeypatch.setattr(MovieService, "get_movie_and_weather_data", get_movie_and_weather_data)
+    job = _job(output, Checkpoint(str(tmp_path / "out.checkpoint"), str(output)))
+    rows = [(0, {"movie_title": "Missing", "latitude": 1, "longitude": 2}), (1, {"movie_title": "Broken", "latitude": 1, "longitude": 2})]
+
+    asyncio.run(job.run(iter(rows), 2, progress_interval=0))
+
+    statuses = {line["row"]: line["status"] for line in map(orjson.loads, output.read_bytes().splitlines())}
+    assert statuses == {0: 404, 1: 500}
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.helpers.cache.single_flight import SingleFlight
+from src.helpers.fetch.deadline import DeadlineExceededError, deadline
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("dune", work) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [{"id": 1}] * 5
+    assert runs == 1
+    assert flight.calls == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")), flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flight.calls == 2
+
+
+def test_exception_reaches_every_caller_and_the_next_call_runs_again():
+    flight = SingleFlight()
+    runs = 0
+
+    async def failing():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("dune", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("dune", failing)
+
+    asyncio.run(scenario())
+    assert runs == 2
+
+
+def test_cancelling_one_caller_leaves_the_work_running_for_the_others():
+    flight = SingleFlight()
+    release = None
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return "done"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.create_task(flight.do("dune", work))
+        second = asyncio.create_task(flight.do("dune", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+    assert runs == 1
+
+
+def test_caller_deadline_does_not_cancel_the_shared_work():
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return "done"
+
+    async def scenario():
+        with deadline(0.01):
+            with pytest.raises(DeadlineExceededError):
+                await flight.do("dune", work)
+        # A caller without a deadline joins the same call and gets its result.
+        assert await flight.do("dune", work) == "done"
+
+    asyncio.run(scenario())
+    assert finished == [True]
+    assert flight.calls == 1
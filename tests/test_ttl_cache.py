@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from src.helpers.cache import ttl_cache
+from src.helpers.cache.ttl_cache import TTLCache
+
+
+def test_get_returns_value_until_ttl_expires(clock):
+    time = clock(ttl_cache)
+    cache = TTLCache(ttl=10)
+
+    cache.set("dune", {"id": 1})
+    time.advance(9)
+    assert cache.get("dune") == {"id": 1}
+
+    time.advance(2)
+    assert cache.get("dune", "missing") == "missing"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_negative_results_use_negative_ttl(clock):
+    time = clock(ttl_cache)
+    cache = TTLCache(ttl=100, negative_ttl=5)
+
+    cache.set("unknown", {})
+    time.advance(6)
+
+    assert cache.get("unknown") is None
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = TTLCache(ttl=60, max_entries=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_entries_are_evicted_to_stay_under_max_bytes():
+    cache = TTLCache(ttl=60, max_bytes=10, sizeof=lambda value: 4)
+
+    for key in "abc":
+        cache.set(key, key)
+
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == 8
+    assert cache.get("a") is None
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    time = clock(ttl_cache)
+    cache = TTLCache(ttl=10, stale_ttl=20)
+    loads = []
+
+    async def loader():
+        loads.append(len(loads) + 1)
+        return f"v{len(loads)}"
+
+    async def scenario():
+        assert await cache.get_or_load("dune", loader) == "v1"
+
+        time.advance(15)
+        # Both callers get the stale value at once; only one refresh is started.
+        assert await cache.get_or_load("dune", loader) == "v1"
+        assert await cache.get_or_load("dune", loader) == "v1"
+        await asyncio.sleep(0.01)
+
+        assert await cache.get_or_load("dune", loader) == "v2"
+
+    asyncio.run(scenario())
+
+    assert loads == [1, 2]
+    assert cache.stale_hits == 2
+
+
+def test_entry_past_the_stale_window_is_reloaded_before_answering(clock):
+    time = clock(ttl_cache)
+    cache = TTLCache(ttl=10, stale_ttl=20)
+    values = iter(["v1", "v2"])
+
+    async def loader():
+        return next(values)
+
+    async def scenario():
+        await cache.get_or_load("dune", loader)
+        time.advance(31)
+        return await cache.get_or_load("dune", loader)
+
+    assert asyncio.run(scenario()) == "v2"
+
+
+def test_expired_entry_is_served_when_the_reload_fails(clock):
+    time = clock(ttl_cache)
+    cache = TTLCache(ttl=10)
+
+    async def failing_loader():
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        cache.set("dune", "old")
+        time.advance(11)
+        return await cache.get_or_load("dune", failing_loader)
+
+    assert asyncio.run(scenario()) == "old"
+    assert cache.served_on_error == 1
+
+
+def test_load_error_is_raised_without_a_previous_entry():
+    cache = TTLCache(ttl=10)
+
+    async def failing_loader():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_load("dune", failing_loader))
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=10)
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return "v1"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("dune", loader) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["v1"] * 5
+    assert loads == 1
+    assert cache.stats()["coalesced"] == 4
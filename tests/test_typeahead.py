@@ -0,0 +1,42 @@
+from src.helpers.typeahead.typeahead import Typeahead
+
+
+def _titles(typeahead, prefix, limit=10):
+    return [suggestion.title for suggestion in typeahead.suggest(prefix, limit)]
+
+
+def test_suggestions_are_the_most_popular_matches():
+    typeahead = Typeahead(top_n=2)
+    typeahead.add(1, "Inception", 80.0)
+    typeahead.add(2, "Interstellar", 90.0)
+    typeahead.add(3, "Insomnia", 20.0)
+    typeahead.add(4, "Dune", 99.0)
+
+    assert _titles(typeahead, "in") == ["Interstellar", "Inception"]
+    assert _titles(typeahead, "ins") == ["Insomnia"]
+
+
+def test_removed_title_lets_the_next_one_move_up():
+    typeahead = Typeahead(max_titles=3, top_n=2)
+    typeahead.add(1, "Inception", 80.0)
+    typeahead.add(2, "Interstellar", 90.0)
+    typeahead.add(3, "Insomnia", 20.0)
+
+    # The least popular title makes room; "Insomnia" was outside the top two of "in".
+    typeahead.add(4, "Dune", 99.0)
+    assert _titles(typeahead, "in") == ["Interstellar", "Inception"]
+
+    typeahead.add(2, "Interstellar", 1.0)
+    assert _titles(typeahead, "in") == ["Inception", "Interstellar"]
+
+
+def test_re_ranked_title_does_not_shrink_the_suggestions():
+    typeahead = Typeahead(top_n=2)
+    typeahead.add(1, "Inception", 80.0)
+    typeahead.add(2, "Interstellar", 90.0)
+    typeahead.add(3, "Insomnia", 20.0)
+
+    typeahead.add(1, "Inception", 10.0)
+    typeahead.add(2, "Interstellar", 5.0)
+
+    assert _titles(typeahead, "in") == ["Insomnia", "Inception"]
@@ -0,0 +1,133 @@
+import pytest
+
+from src.helpers.fetch import upstream_scheduler
+from src.helpers.fetch.upstream_scheduler import CircuitBreaker, TokenBucket, UpstreamScheduler
+from src.helpers.settings.settings import get_settings
+
+
+def test_bucket_allows_a_burst_then_runs_dry(clock):
+    clock(upstream_scheduler)
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert [bucket.try_take() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst(clock):
+    time = clock(upstream_scheduler)
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.try_take()
+
+    time.advance(1)
+    assert [bucket.try_take() for _ in range(3)] == [True, True, False]
+
+    time.advance(60)
+    assert sum(bucket.try_take() for _ in range(10)) == 3
+
+
+def test_drained_bucket_gives_no_tokens_until_retry_after_has_passed(clock):
+    time = clock(upstream_scheduler)
+    bucket = TokenBucket(rate=2, burst=3)
+
+    bucket.drain(5)
+    assert bucket.wait_time() == pytest.approx(5.5)
+
+    time.advance(5)
+    assert not bucket.try_take()
+    time.advance(0.5)
+    assert bucket.try_take()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    time = clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.advance(10)
+    assert breaker.retry_after() == pytest.approx(20)
+
+
+def test_success_resets_the_failure_count(clock):
+    clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_opens_for_a_single_trial_after_the_reset_timeout(clock):
+    time = clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    time.advance(30)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_breaker(clock):
+    time = clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    time.advance(30)
+    breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert all(breaker.allow() for _ in range(3))
+
+
+def test_failed_trial_reopens_the_breaker_for_another_reset_timeout(clock):
+    time = clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    time.advance(30)
+    breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_abandoned_trial_lets_another_trial_through(clock):
+    time = clock(upstream_scheduler)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    time.advance(30)
+    assert breaker.allow()
+
+    breaker.record_abandoned()
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_scheduler_below_one_call_per_second_still_admits_calls(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_RATE", "0.5")
+    monkeypatch.delenv("UPSTREAM_BURST", raising=False)
+    monkeypatch.setattr(UpstreamScheduler, "_schedulers", {})
+    get_settings.cache_clear()
+    try:
+        scheduler = UpstreamScheduler.for_host("slow.test")
+    finally:
+        get_settings.cache_clear()
+
+    assert scheduler.bucket.burst == 1
+    assert scheduler.bucket.try_take()
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from src.utils.weather_utils import get_weather_for_date, peek_weather_for_date
+
+
+@pytest.mark.parametrize("day", [None, "", "2020-13-45"])
+def test_missing_or_malformed_release_date_has_no_weather(day):
+    weather = asyncio.run(get_weather_for_date(latitude=40.4, longitude=-3.7, day=day))
+
+    assert weather["temperature_max"] is None
+    assert weather["temperature_min"] is None
+    assert "release date" in weather["message"]
+    assert peek_weather_for_date(latitude=40.4, longitude=-3.7, day=day) == weather
+
+
+def test_release_date_before_the_records_has_no_weather():
+    weather = asyncio.run(get_weather_for_date(latitude=40.4, longitude=-3.7, day="1999-03-31"))
+
+    assert weather["temperature_max"] is None
+    assert "2016-01-01" in weather["message"]